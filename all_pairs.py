@@ -0,0 +1,148 @@
+from __future__ import annotations
+from typing import TypeVar, Optional, Sequence
+from array import array
+from math import inf
+from multiprocessing import shared_memory
+import multiprocessing
+from weighted_graph import WeightedGraph
+from dijkstra import dijkstra
+from generic_search import fork_context
+
+
+V = TypeVar('V') # tipo dos vértices no grafo
+DistanceMatrix = list[array] # uma linha array('d') por origem; inf = inalcançável
+
+# estado de cada processo trabalhador, preenchido uma única vez pelo inicializador
+_worker_graph: Optional[WeightedGraph] = None
+_worker_matrix: Optional[memoryview] = None
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+
+
+class SharedDistanceMatrix(Sequence[memoryview]):
+    """Matriz V x V que os processos preencheram, lida direto da memória
+    compartilhada, sem copiar. Cada linha é uma memoryview de float64 (inf =
+    inalcançável). O segmento já sai do sistema de arquivos ao ser criado o
+    objeto; a memória volta ao sistema em close() ou ao sair de um with, desde
+    que nenhuma linha ainda esteja em uso."""
+
+    def __init__(self, memory: shared_memory.SharedMemory, vertex_count: int) -> None:
+        self._memory: shared_memory.SharedMemory = memory
+        self._flat: memoryview = memory.buf.cast('d')
+        self._vertex_count: int = vertex_count
+
+    def __len__(self) -> int:
+        return self._vertex_count
+
+    def __getitem__(self, row: int) -> memoryview:
+        if row < 0:
+            row += self._vertex_count
+        if not 0 <= row < self._vertex_count:
+            raise IndexError(row)
+        return self._flat[row * self._vertex_count:(row + 1) * self._vertex_count]
+
+    # Cópia privada em arrays, no formato de floyd_warshall
+    def to_arrays(self) -> DistanceMatrix:
+        return [array('d', row) for row in self]
+
+    def close(self) -> None:
+        self._flat.release() # antes de fechar: SharedMemory não fecha com visões abertas
+        self._memory.close()
+
+    def __del__(self) -> None:
+        try:
+            self.close()
+        except BufferError:
+            pass # alguma linha ainda está em uso; o mapeamento some com ela
+
+    def __enter__(self) -> SharedDistanceMatrix:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _init_worker(wg: WeightedGraph, memory_name: str) -> None:
+    global _worker_graph, _worker_matrix, _worker_memory
+    _worker_graph = wg
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_matrix = _worker_memory.buf.cast('d')
+
+
+def _fill_row(source: int) -> None:
+    # escreve a linha direto na memória compartilhada; nada volta pelo pipe
+    distances, _ = dijkstra(_worker_graph, _worker_graph.vertex_at(source))
+    start: int = source * len(distances)
+    for target, distance in enumerate(distances):
+        _worker_matrix[start + target] = inf if distance is None else distance
+
+
+# Roda dijkstra a partir de cada vértice num conjunto de processos; cada processo
+# grava as suas linhas numa matriz em memória compartilhada, que é devolvida sem
+# cópia (use to_arrays() se precisar de uma cópia privada)
+def all_pairs_dijkstra(wg: WeightedGraph[V], processes: Optional[int] = None) -> SharedDistanceMatrix:
+    vertex_count: int = wg.vertex_count
+    # SharedMemory não aceita tamanho 0
+    memory: shared_memory.SharedMemory = shared_memory.SharedMemory(create=True, size=max(8, vertex_count * vertex_count * 8))
+    try:
+        with fork_context().Pool(processes, initializer=_init_worker, initargs=(wg, memory.name)) as pool:
+            # blocos de origens por tarefa para diluir o custo de cada mensagem
+            chunk: int = max(1, vertex_count // (4 * (processes or multiprocessing.cpu_count())))
+            for _ in pool.imap_unordered(_fill_row, range(vertex_count), chunksize=chunk):
+                pass
+    except BaseException:
+        memory.close()
+        raise
+    finally:
+        # os processos já terminaram: o nome pode sumir, o mapeamento continua válido
+        memory.unlink()
+    return SharedDistanceMatrix(memory, vertex_count)
+
+
+# Floyd-Warshall: O(V³), mas sem filas nem processos; melhor para grafos pequenos e densos
+def floyd_warshall(wg: WeightedGraph[V]) -> DistanceMatrix:
+    vertex_count: int = wg.vertex_count
+    distances: list[list[float]] = [[inf] * vertex_count for _ in range(vertex_count)]
+    for u in range(vertex_count):
+        distances[u][u] = 0
+        for we in wg.edges_for_index(u):
+            if we.weight < distances[u][we.v]:
+                distances[u][we.v] = we.weight
+
+    for k in range(vertex_count):
+        row_k: list[float] = distances[k]
+        for row_i in distances:
+            through_k: float = row_i[k]
+            if through_k == inf:
+                continue
+            for j in range(vertex_count):
+                if through_k + row_k[j] < row_i[j]:
+                    row_i[j] = through_k + row_k[j]
+
+    return [array('d', row) for row in distances]
+
+
+if __name__ == '__main__':
+    city_graph2: WeightedGraph[str] = WeightedGraph([
+        "Seattle", "San Francisco", "Los Angeles", "Riverside", "Phoenix",
+        "Chicago", "Boston", "New York", "Atlanta", "Miami", "Dallas",
+        "Houston", "Detroit", "Philadelphia", "Washington"
+    ])
+    city_graph2.add_edges_by_vertices([
+        ("Seattle", "Chicago", 1737), ("Seattle", "San Francisco", 678),
+        ("San Francisco", "Riverside", 386), ("San Francisco", "Los Angeles", 348),
+        ("Los Angeles", "Riverside", 50), ("Los Angeles", "Phoenix", 357),
+        ("Riverside", "Phoenix", 307), ("Riverside", "Chicago", 1704),
+        ("Phoenix", "Dallas", 887), ("Phoenix", "Houston", 1015),
+        ("Dallas", "Chicago", 805), ("Dallas", "Atlanta", 721),
+        ("Dallas", "Houston", 225), ("Houston", "Atlanta", 702),
+        ("Houston", "Miami", 968), ("Atlanta", "Chicago", 588),
+        ("Atlanta", "Washington", 543), ("Atlanta", "Miami", 604),
+        ("Miami", "Washington", 923), ("Chicago", "Detroit", 238),
+        ("Detroit", "Boston", 613), ("Detroit", "Washington", 396),
+        ("Detroit", "New York", 482), ("Boston", "New York", 190),
+        ("New York", "Philadelphia", 81), ("Philadelphia", "Washington", 123),
+    ])
+
+    with all_pairs_dijkstra(city_graph2) as matrix:
+        print(f"Los Angeles -> Boston: {matrix[city_graph2.index_of('Los Angeles')][city_graph2.index_of('Boston')]}")
+        print(f"Floyd-Warshall agrees: {matrix.to_arrays() == floyd_warshall(city_graph2)}")
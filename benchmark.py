@@ -0,0 +1,139 @@
+from __future__ import annotations
+from typing import Callable, Optional, Any
+from time import perf_counter
+from math import pi
+from datetime import datetime, timezone
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from weighted_graph import WeightedGraph
+from generic_search import bfs
+from dijkstra import dijkstra
+from mst import mst
+from graph_generators import grid_graph, random_geometric_graph, barabasi_albert_graph, erdos_renyi_graph
+
+try:
+    import resource # só existe em sistemas Unix
+except ImportError:
+    resource = None
+
+
+# Mede construção de grafos, bfs, dijkstra e mst em vários tamanhos e grava tempo,
+# vazão e pico de memória (RSS) em JSON. Cada caso roda num processo novo, senão o
+# pico de um caso grande contaminaria todos os seguintes. O pico inclui o grafo.
+#
+#   python benchmark.py --sizes 1000 10000 100000 --output benchmark.json
+
+GENERATORS: dict[str, Callable[[int, int], WeightedGraph[int]]] = {
+    "grid": lambda n, seed: grid_graph(max(1, int(n ** 0.5)), max(1, int(n ** 0.5)), seed),
+    "geometric": lambda n, seed: random_geometric_graph(n, (8 / (pi * n)) ** 0.5, seed), # grau médio ~8
+    "power_law": lambda n, seed: barabasi_albert_graph(n, min(4, n - 1), seed),
+    "erdos_renyi": lambda n, seed: erdos_renyi_graph(n, min(1.0, 8 / n), seed),
+}
+
+
+def _run_bfs(wg: WeightedGraph[int]) -> None:
+    # o objetivo nunca é alcançado: percorre todo o componente da origem
+    bfs(0, lambda _: False, lambda u: [edge.v for edge in wg.edges_for_index(u)])
+
+
+ALGORITHMS: dict[str, Optional[Callable[[WeightedGraph[int]], Any]]] = {
+    "construction": None, # só o tempo do gerador
+    "bfs": _run_bfs,
+    "dijkstra": lambda wg: dijkstra(wg, 0),
+    "mst": mst,
+}
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux informa em KiB
+
+
+# Executado no processo filho: monta o grafo, roda o algoritmo e devolve as medidas
+def run_case(graph: str, algorithm: str, size: int, seed: int, repeat: int) -> dict[str, Any]:
+    start: float = perf_counter()
+    wg: WeightedGraph[int] = GENERATORS[graph](size, seed)
+    construction: float = perf_counter() - start
+    run: Optional[Callable[[WeightedGraph[int]], Any]] = ALGORITHMS[algorithm]
+    seconds: float = construction
+    if run is not None and wg.vertex_count > 0:
+        seconds = min(_timed(run, wg) for _ in range(repeat)) # o melhor de repeat
+    edges: int = wg.edge_count // 2
+    return {
+        "graph": graph, "algorithm": algorithm, "size": size, "seed": seed,
+        "vertices": wg.vertex_count, "edges": edges,
+        "seconds": seconds, "construction_seconds": construction,
+        "vertices_per_second": wg.vertex_count / seconds if seconds else None,
+        "edges_per_second": edges / seconds if seconds else None,
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def _timed(run: Callable[[WeightedGraph[int]], Any], wg: WeightedGraph[int]) -> float:
+    start: float = perf_counter()
+    run(wg)
+    return perf_counter() - start
+
+
+def run_benchmarks(graphs: list[str], algorithms: list[str], sizes: list[int],
+                   seed: int = 0, repeat: int = 3, timeout: Optional[float] = None) -> dict[str, Any]:
+    results: list[dict[str, Any]] = []
+    for graph in graphs:
+        for size in sizes:
+            for algorithm in algorithms:
+                case: list[str] = [sys.executable, __file__, "--case", graph, algorithm, str(size),
+                                   "--seed", str(seed), "--repeat", str(repeat)]
+                try:
+                    finished = subprocess.run(case, capture_output=True, text=True, timeout=timeout)
+                except subprocess.TimeoutExpired:
+                    result: dict[str, Any] = {"graph": graph, "algorithm": algorithm, "size": size,
+                                              "error": f"timeout after {timeout}s"}
+                else:
+                    if finished.returncode == 0:
+                        result = json.loads(finished.stdout)
+                    else:
+                        result = {"graph": graph, "algorithm": algorithm, "size": size,
+                                  "error": finished.stderr.strip().splitlines()[-1:]}
+                results.append(result)
+                print(_summary(result), file=sys.stderr)
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version, "platform": platform.platform(),
+        "results": results,
+    }
+
+
+def _summary(result: dict[str, Any]) -> str:
+    name: str = f"{result['graph']:>12} {result['algorithm']:>12} {result['size']:>9}"
+    if "error" in result:
+        return f"{name}  error: {result['error']}"
+    peak: str = "?" if result["peak_rss_bytes"] is None else f"{result['peak_rss_bytes'] / 2 ** 20:.0f} MiB"
+    return f"{name}  {result['seconds']:9.4f}s  {result['edges_per_second'] or 0:12.0f} edges/s  {peak}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark of graph construction, bfs, dijkstra and mst")
+    parser.add_argument("--graphs", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--algorithms", nargs="+", choices=list(ALGORITHMS), default=list(ALGORITHMS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=[1_000, 10_000, 100_000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=None, help="seconds per case")
+    parser.add_argument("--output", default="benchmark.json")
+    parser.add_argument("--case", nargs=3, metavar=("GRAPH", "ALGORITHM", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case is not None: # processo filho: um único caso, resultado na saída padrão
+        graph, algorithm, size = args.case
+        print(json.dumps(run_case(graph, algorithm, int(size), args.seed, args.repeat)))
+    else:
+        report: dict[str, Any] = run_benchmarks(args.graphs, args.algorithms, args.sizes,
+                                                args.seed, args.repeat, args.timeout)
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.output}")
@@ -0,0 +1,279 @@
+from __future__ import annotations
+from typing import TypeVar, Optional
+from array import array
+import struct
+import sys
+from weighted_graph import WeightedGraph
+from weighted_edge import WeightedEdge
+from mst import WeightedPath, print_weight_path
+from generic_search import IndexedPriorityQueue
+
+
+V = TypeVar('V') # tipo dos vértices no grafo
+NO_MIDDLE: int = -1 # marca uma aresta original, que não é atalho
+
+# cabeçalho do arquivo: magic, ordem dos bytes (0 little, 1 big), V, arestas de subida
+HEADER: struct.Struct = struct.Struct("<4sBqq")
+MAGIC: bytes = b"CHIE"
+
+
+class ContractionHierarchy:
+    """Contraction Hierarchies para consultas repetidas em um WeightedGraph estático.
+
+    Os vértices são contraídos um a um, do menos para o mais importante. Ao contrair
+    v, cada par de vizinhos u, w cujo único caminho mínimo passa por v ganha um atalho
+    u - w guardando v como vértice do meio. Uma consulta é um Dijkstra bidirecional
+    que só sobe na hierarquia, e os atalhos são desfeitos no fim. Como Graph, supõe
+    um grafo não direcionado.
+
+    O grafo de subida fica em formato CSR: para cada vértice, as arestas para vizinhos
+    de posto maior, com peso e vértice do meio."""
+
+    def __init__(self, rank: array, up_offsets: array, up_targets: array,
+                 up_weights: array, up_middles: array) -> None:
+        self._rank: array = rank # ordem de contração de cada vértice
+        self._up_offsets: array = up_offsets
+        self._up_targets: array = up_targets
+        self._up_weights: array = up_weights
+        self._up_middles: array = up_middles
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self._rank)
+
+    @property
+    def shortcut_count(self) -> int:
+        return sum(1 for middle in self._up_middles if middle != NO_MIDDLE)
+
+    # Pré-processamento: ordena e contrai os vértices, inserindo os atalhos
+    @classmethod
+    def build(cls, wg: WeightedGraph[V], witness_limit: int = 50) -> ContractionHierarchy:
+        vertex_count: int = wg.vertex_count
+        # grafo restante: vizinho -> (peso, vértice do meio), com a menor aresta de cada par
+        adjacency: list[dict[int, tuple[float, int]]] = [{} for _ in range(vertex_count)]
+        for u in range(vertex_count):
+            for we in wg.edges_for_index(u):
+                if we.v != u and (we.v not in adjacency[u] or we.weight < adjacency[u][we.v][0]):
+                    adjacency[u][we.v] = (we.weight, NO_MIDDLE)
+
+        deleted_neighbors: list[int] = [0] * vertex_count
+
+        def priority(v: int) -> tuple[float, list[tuple[int, int, float]]]:
+            # diferença de arestas mais vizinhos já contraídos, para espalhar a contração;
+            # os atalhos voltam junto para não repetir as buscas de testemunha ao contrair
+            shortcuts = _shortcuts(adjacency, v, witness_limit)
+            return len(shortcuts) - len(adjacency[v]) + deleted_neighbors[v], shortcuts
+
+        queue: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+        for v in range(vertex_count):
+            queue.push(v, priority(v)[0])
+
+        rank: array = array('i', [0]) * vertex_count
+        upward: list[list[tuple[int, float, int]]] = [[] for _ in range(vertex_count)]
+        order: int = 0
+        while not queue.empty:
+            v: int = queue.pop()
+            # atualização preguiçosa: se a prioridade piorou, volta para a fila
+            current, shortcuts = priority(v)
+            if not queue.empty and current > queue.priority(queue.peek()):
+                queue.push(v, current)
+                continue
+
+            for u, w, weight in shortcuts:
+                if w not in adjacency[u] or weight < adjacency[u][w][0]:
+                    adjacency[u][w] = (weight, v)
+                    adjacency[w][u] = (weight, v)
+
+            # as arestas que sobram levam a vértices ainda não contraídos, de posto maior
+            for u, (weight, middle) in adjacency[v].items():
+                upward[v].append((u, weight, middle))
+                del adjacency[u][v]
+                deleted_neighbors[u] += 1
+            adjacency[v] = {}
+
+            rank[v] = order
+            order += 1
+
+        up_offsets: array = array('q', [0])
+        up_targets: array = array('i')
+        up_weights: array = array('d')
+        up_middles: array = array('i')
+        for edges in upward:
+            for u, weight, middle in edges:
+                up_targets.append(u)
+                up_weights.append(weight)
+                up_middles.append(middle)
+            up_offsets.append(len(up_targets))
+
+        return cls(rank, up_offsets, up_targets, up_weights, up_middles)
+
+    # Distância e caminho (em arestas originais) entre dois índices de vértices
+    def query(self, first: int, last: int) -> Optional[WeightedPath]:
+        if first == last:
+            return []
+
+        distances: tuple[dict[int, float], dict[int, float]] = ({first: 0}, {last: 0})
+        # vértice -> (vértice anterior, peso, meio) da aresta de subida usada
+        parents: tuple[dict[int, tuple[int, float, int]], dict[int, tuple[int, float, int]]] = ({}, {})
+        queues: tuple[IndexedPriorityQueue[int], IndexedPriorityQueue[int]] = (IndexedPriorityQueue(), IndexedPriorityQueue())
+        queues[0].push(first, 0)
+        queues[1].push(last, 0)
+        best: float = float("inf")
+        meeting: Optional[int] = None
+
+        while True:
+            # cada lado só continua enquanto o seu topo ainda pode melhorar o encontro
+            tops: list[float] = [queue.priority(queue.peek()) if not queue.empty else float("inf")
+                                 for queue in queues]
+            if min(tops) >= best:
+                break
+            side: int = 0 if tops[0] <= tops[1] else 1
+            dist, other = distances[side], distances[1 - side]
+            u: int = queues[side].pop()
+
+            if u in other and dist[u] + other[u] < best:
+                best = dist[u] + other[u]
+                meeting = u
+
+            for i in range(self._up_offsets[u], self._up_offsets[u + 1]):
+                v: int = self._up_targets[i]
+                weight: float = self._up_weights[i]
+                if v not in dist or dist[u] + weight < dist[v]:
+                    dist[v] = dist[u] + weight
+                    parents[side][v] = (u, weight, self._up_middles[i])
+                    queues[side].push_or_decrease(v, dist[v])
+
+        if meeting is None:
+            return None
+
+        # sobe da origem até o encontro e desce do encontro até o destino
+        forward: list[tuple[int, int, float, int]] = []
+        vertex: int = meeting
+        while vertex != first:
+            u, weight, middle = parents[0][vertex]
+            forward.append((u, vertex, weight, middle))
+            vertex = u
+        forward.reverse()
+        vertex = meeting
+        while vertex != last:
+            u, weight, middle = parents[1][vertex]
+            forward.append((vertex, u, weight, middle))
+            vertex = u
+
+        path: WeightedPath = []
+        for u, v, weight, middle in forward:
+            self._unpack(u, v, weight, middle, path)
+        return path
+
+    def shortest_path(self, wg: WeightedGraph[V], source: V, target: V) -> Optional[WeightedPath]:
+        return self.query(wg.index_of(source), wg.index_of(target))
+
+    # Um atalho u - v com meio m vira as arestas u - m e m - v, que estão na lista de
+    # subida de m (m foi contraído antes dos dois); repete até só sobrarem originais
+    def _unpack(self, u: int, v: int, weight: float, middle: int, path: WeightedPath) -> None:
+        stack: list[tuple[int, int, float, int]] = [(u, v, weight, middle)]
+        while stack:
+            u, v, weight, middle = stack.pop()
+            if middle == NO_MIDDLE:
+                path.append(WeightedEdge(u, v, weight))
+                continue
+            second_weight, second_middle = self._up_edge(middle, v)
+            first_weight, first_middle = self._up_edge(middle, u)
+            stack.append((middle, v, second_weight, second_middle))
+            stack.append((u, middle, first_weight, first_middle))
+
+    def _up_edge(self, u: int, v: int) -> tuple[float, int]:
+        for i in range(self._up_offsets[u], self._up_offsets[u + 1]):
+            if self._up_targets[i] == v:
+                return self._up_weights[i], self._up_middles[i]
+        raise LookupError(f"não há aresta de subida {u} - {v}")
+
+    # Grava a hierarquia para não refazer o pré-processamento a cada inicialização
+    def save(self, path: str) -> None:
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, sys.byteorder == "big", self.vertex_count, len(self._up_targets)))
+            for buffer in (self._rank, self._up_offsets, self._up_targets, self._up_weights, self._up_middles):
+                buffer.tofile(file)
+
+    @classmethod
+    def load(cls, path: str) -> ContractionHierarchy:
+        with open(path, "rb") as file:
+            magic, big_endian, vertex_count, edge_count = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} não é uma hierarquia de contração")
+            buffers: list[array] = []
+            for typecode, count in (('i', vertex_count), ('q', vertex_count + 1), ('i', edge_count),
+                                    ('d', edge_count), ('i', edge_count)):
+                buffer: array = array(typecode)
+                buffer.fromfile(file, count)
+                if big_endian != (sys.byteorder == "big"):
+                    buffer.byteswap()
+                buffers.append(buffer)
+        return cls(*buffers)
+
+
+def _shortcuts(adjacency: list[dict[int, tuple[float, int]]], v: int,
+               witness_limit: int) -> list[tuple[int, int, float]]:
+    """Atalhos necessários para contrair v: pares de vizinhos sem caminho testemunha
+    (que evite v) tão curto quanto passar por v"""
+    neighbors: list[tuple[int, float]] = [(u, weight) for u, (weight, _) in adjacency[v].items()]
+    shortcuts: list[tuple[int, int, float]] = []
+    for i, (u, weight_u) in enumerate(neighbors):
+        targets: list[tuple[int, float]] = [(w, weight_u + weight_w) for w, weight_w in neighbors[i + 1:]]
+        if not targets:
+            continue
+        witness: dict[int, float] = _witness_search(adjacency, u, v, max(cost for _, cost in targets), witness_limit)
+        for w, cost in targets:
+            if witness.get(w, float("inf")) > cost:
+                shortcuts.append((u, w, cost))
+    return shortcuts
+
+
+def _witness_search(adjacency: list[dict[int, tuple[float, int]]], source: int, excluded: int,
+                    max_distance: float, max_settled: int) -> dict[int, float]:
+    """Dijkstra limitado a partir de source, ignorando o vértice sendo contraído.
+    Parar cedo só pode gerar atalhos a mais, nunca resultados errados."""
+    distances: dict[int, float] = {source: 0}
+    pq: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+    pq.push(source, 0)
+    settled: int = 0
+    while not pq.empty and settled < max_settled:
+        u: int = pq.pop()
+        if distances[u] > max_distance:
+            break
+        settled += 1
+        for v, (weight, _) in adjacency[u].items():
+            if v == excluded:
+                continue
+            if v not in distances or distances[u] + weight < distances[v]:
+                distances[v] = distances[u] + weight
+                pq.push_or_decrease(v, distances[v])
+    return distances
+
+
+if __name__ == '__main__':
+    city_graph2: WeightedGraph[str] = WeightedGraph([
+        "Seattle", "San Francisco", "Los Angeles", "Riverside", "Phoenix",
+        "Chicago", "Boston", "New York", "Atlanta", "Miami", "Dallas",
+        "Houston", "Detroit", "Philadelphia", "Washington"
+    ])
+    city_graph2.add_edges_by_vertices([
+        ("Seattle", "Chicago", 1737), ("Seattle", "San Francisco", 678),
+        ("San Francisco", "Riverside", 386), ("San Francisco", "Los Angeles", 348),
+        ("Los Angeles", "Riverside", 50), ("Los Angeles", "Phoenix", 357),
+        ("Riverside", "Phoenix", 307), ("Riverside", "Chicago", 1704),
+        ("Phoenix", "Dallas", 887), ("Phoenix", "Houston", 1015),
+        ("Dallas", "Chicago", 805), ("Dallas", "Atlanta", 721),
+        ("Dallas", "Houston", 225), ("Houston", "Atlanta", 702),
+        ("Houston", "Miami", 968), ("Atlanta", "Chicago", 588),
+        ("Atlanta", "Washington", 543), ("Atlanta", "Miami", 604),
+        ("Miami", "Washington", 923), ("Chicago", "Detroit", 238),
+        ("Detroit", "Boston", 613), ("Detroit", "Washington", 396),
+        ("Detroit", "New York", 482), ("Boston", "New York", 190),
+        ("New York", "Philadelphia", 81), ("Philadelphia", "Washington", 123),
+    ])
+
+    hierarchy: ContractionHierarchy = ContractionHierarchy.build(city_graph2)
+    print(f"Shortcuts added: {hierarchy.shortcut_count}")
+    print("Shortest path from Los Angeles to Boston:")
+    print_weight_path(city_graph2, hierarchy.shortest_path(city_graph2, "Los Angeles", "Boston"))
@@ -0,0 +1,283 @@
+from __future__ import annotations
+from typing import TypeVar, Generic, Optional, Sequence, Union, BinaryIO
+from array import array
+import mmap
+import pickle
+import struct
+import sys
+from edge import Edge
+from weighted_edge import WeightedEdge
+from graph import Graph
+
+
+V = TypeVar('V') # tipo dos vértices no grafo
+Buffer = Union[array, memoryview] # qualquer buffer indexável de números
+
+# Formato binário: cabeçalho, offsets (int64), targets (int32), weights (float64,
+# opcional) e a tabela de vértices. Tudo little-endian, com seções alinhadas em 8 bytes.
+# A tabela de vértices é uma de: nomes UTF-8, inteiros int64, nada (os vértices são
+# 0..V-1) ou, só quando pedido com allow_pickle, um pickle de qualquer lista.
+MAGIC: bytes = b"CSRG"
+FORMAT_VERSION: int = 1
+HEADER: struct.Struct = struct.Struct("<4sHHqqq") # magic, versão, flags, V, E, bytes dos vértices
+WEIGHTED_FLAG: int = 1
+PICKLED_VERTICES_FLAG: int = 2
+INT_VERTICES_FLAG: int = 4
+RANGE_VERTICES_FLAG: int = 8
+
+
+class CSRGraph(Generic[V]):
+    """Grafo imutável no formato CSR (compressed sparse row).
+
+    As arestas que saem do vértice i são as posições offsets[i] até offsets[i + 1]
+    de targets (e de weights, se o grafo tiver pesos). Em vez de um objeto Edge por
+    aresta, são três buffers de números. A interface de leitura é a mesma de Graph e
+    WeightedGraph, então bfs, dijkstra e mst rodam direto sobre ele."""
+
+    def __init__(self, vertices: Sequence[V], offsets: Buffer, targets: Buffer,
+                 weights: Optional[Buffer] = None) -> None:
+        self._vertices: Sequence[V] = vertices
+        self._indices: Optional[dict[V, int]] = None # criado na primeira consulta
+        self._offsets: Buffer = offsets
+        self._targets: Buffer = targets
+        self._weights: Optional[Buffer] = weights
+
+    # Converte um Graph ou WeightedGraph já montado
+    @classmethod
+    def from_graph(cls, graph: Graph[V]) -> CSRGraph[V]:
+        offsets: array = array('q', [0])
+        targets: array = array('i')
+        weights: array = array('d')
+        weighted: bool = False
+        for index in range(graph.vertex_count):
+            for edge in graph.edges_for_index(index):
+                targets.append(edge.v)
+                if isinstance(edge, WeightedEdge):
+                    weighted = True
+                    weights.append(edge.weight)
+            offsets.append(len(targets))
+        return cls([graph.vertex_at(i) for i in range(graph.vertex_count)],
+                   offsets, targets, weights if weighted else None)
+
+    # Monta a partir de arrays de arestas (u[i], v[i], weights[i]); por padrão o grafo
+    # não é direcionado, como Graph, e cada aresta entra nas duas direções
+    @classmethod
+    def from_edges(cls, vertices: Sequence[V], us: Sequence[int], vs: Sequence[int],
+                   weights: Optional[Sequence[float]] = None,
+                   undirected: bool = True) -> CSRGraph[V]:
+        vertex_count: int = len(vertices)
+        if undirected:
+            us, vs = list(us) + list(vs), list(vs) + list(us)
+            if weights is not None:
+                weights = list(weights) * 2
+
+        # ordenação por contagem: conta o grau de cada vértice e calcula os inícios
+        offsets: array = array('q', [0]) * (vertex_count + 1)
+        for u in us:
+            offsets[u + 1] += 1
+        for i in range(vertex_count):
+            offsets[i + 1] += offsets[i]
+
+        positions: array = array('q', offsets[:-1])
+        targets: array = array('i', [0]) * len(us)
+        sorted_weights: Optional[array] = None if weights is None else array('d', [0.0]) * len(us)
+        for i, (u, v) in enumerate(zip(us, vs)):
+            position: int = positions[u]
+            targets[position] = v
+            if sorted_weights is not None:
+                sorted_weights[position] = weights[i]
+            positions[u] = position + 1
+
+        return cls(list(vertices), offsets, targets, sorted_weights)
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self._vertices)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self._targets)
+
+    @property
+    def version(self) -> int:
+        return 0 # imutável: a versão nunca muda
+
+    @property
+    def weighted(self) -> bool:
+        return self._weights is not None
+
+    def vertex_at(self, index: int) -> V:
+        return self._vertices[index]
+
+    def index_of(self, vertex: V) -> int:
+        if isinstance(self._vertices, range):
+            try:
+                return self._vertices.index(vertex) # O(1), sem dicionário
+            except ValueError:
+                raise ValueError(f"{vertex} não está no grafo") from None
+        if self._indices is None:
+            self._indices = {}
+            for index, vertex_at in enumerate(self._vertices):
+                self._indices.setdefault(vertex_at, index)
+        try:
+            return self._indices[vertex]
+        except KeyError:
+            raise ValueError(f"{vertex} não está no grafo") from None
+
+    # Índices dos vizinhos sem cópia (uma fatia do buffer de destinos)
+    def neighbor_indices(self, index: int) -> memoryview:
+        return memoryview(self._targets)[self._offsets[index]:self._offsets[index + 1]]
+
+    def neighbors_for_index(self, index: int) -> list[V]:
+        return [self._vertices[v] for v in self.neighbor_indices(index)]
+
+    def neighbors_for_vertex(self, vertex: V) -> list[V]:
+        return self.neighbors_for_index(self.index_of(vertex))
+
+    def neighbors_for_index_with_weights(self, index: int) -> list[tuple[V, float]]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        return [(self._vertices[self._targets[i]], self._weights[i]) for i in range(start, end)]
+
+    def neighbors_for_vertex_with_weights(self, vertex: V) -> list[tuple[V, float]]:
+        return self.neighbors_for_index_with_weights(self.index_of(vertex))
+
+    # As arestas são criadas só quando pedidas, para quem precisa de objetos Edge
+    def edges_for_index(self, index: int) -> list[Edge]:
+        start, end = self._offsets[index], self._offsets[index + 1]
+        if self._weights is None:
+            return [Edge(index, self._targets[i]) for i in range(start, end)]
+        return [WeightedEdge(index, self._targets[i], self._weights[i]) for i in range(start, end)]
+
+    def edges_for_vertex(self, vertex: V) -> list[Edge]:
+        return self.edges_for_index(self.index_of(vertex))
+
+    # Grava o grafo no formato binário descrito no topo do módulo. Vértices que não
+    # são todos str ou todos int só são aceitos com allow_pickle
+    def save(self, path: str, allow_pickle: bool = False) -> None:
+        vertices: list[V] = list(self._vertices)
+        flags: int = 0 if self._weights is None else WEIGHTED_FLAG
+        vertex_table: bytes = b""
+        if all(type(vertex) is int for vertex in vertices): # bool também é int, mas não entra
+            if vertices != list(range(len(vertices))):
+                flags |= INT_VERTICES_FLAG
+                vertex_table = _little_endian(array('q', vertices))
+            else:
+                flags |= RANGE_VERTICES_FLAG # 0..V-1: não precisa gravar nada
+        elif all(isinstance(vertex, str) for vertex in vertices):
+            encoded: list[bytes] = [vertex.encode("utf-8") for vertex in vertices]
+            starts: array = array('q', [0])
+            for name in encoded:
+                starts.append(starts[-1] + len(name))
+            vertex_table = _little_endian(starts) + b"".join(encoded)
+        elif allow_pickle:
+            flags |= PICKLED_VERTICES_FLAG
+            vertex_table = pickle.dumps(vertices)
+        else:
+            raise TypeError("os vértices devem ser todos str ou todos int (ou use allow_pickle=True)")
+
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, FORMAT_VERSION, flags, self.vertex_count,
+                                   self.edge_count, len(vertex_table)))
+            _write_section(file, _little_endian(array('q', self._offsets)))
+            _write_section(file, _little_endian(array('i', self._targets)))
+            if self._weights is not None:
+                _write_section(file, _little_endian(array('d', self._weights)))
+            _write_section(file, vertex_table)
+
+    # Abre um grafo gravado com save usando mmap: os buffers são visões diretas do
+    # arquivo, nada é copiado nem convertido em objetos até ser consultado. Tabelas
+    # em pickle podem executar código ao serem lidas, por isso exigem allow_pickle
+    @classmethod
+    def load(cls, path: str, allow_pickle: bool = False) -> CSRGraph:
+        with open(path, "rb") as file:
+            mapped: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        view: memoryview = memoryview(mapped)
+
+        magic, version, flags, vertex_count, edge_count, table_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path} não é um grafo CSR versão {FORMAT_VERSION}")
+
+        position: int = _aligned(HEADER.size)
+        offsets, position = _read_section(view, position, 'q', vertex_count + 1)
+        targets, position = _read_section(view, position, 'i', edge_count)
+        weights: Optional[Buffer] = None
+        if flags & WEIGHTED_FLAG:
+            weights, position = _read_section(view, position, 'd', edge_count)
+
+        table: memoryview = view[position:position + table_size]
+        if flags & RANGE_VERTICES_FLAG:
+            vertices: Sequence = range(vertex_count)
+        elif flags & INT_VERTICES_FLAG:
+            vertices, _ = _read_section(table, 0, 'q', vertex_count)
+        elif flags & PICKLED_VERTICES_FLAG:
+            if not allow_pickle:
+                raise ValueError(f"{path} guarda os vértices em pickle; use allow_pickle=True se confiar no arquivo")
+            vertices = pickle.loads(table)
+        else:
+            starts, _ = _read_section(table, 0, 'q', vertex_count + 1)
+            vertices = _StringTable(starts, table[8 * (vertex_count + 1):])
+
+        return cls(vertices, offsets, targets, weights)
+
+    def __str__(self) -> str:
+        desc: str = ""
+        for i in range(self.vertex_count):
+            if self.weighted:
+                desc += f"{self.vertex_at(i)} -> {self.neighbors_for_index_with_weights(i)}\n"
+            else:
+                desc += f"{self.vertex_at(i)} -> {self.neighbors_for_index(i)}\n"
+        return desc
+
+
+class _StringTable(Sequence[str]):
+    """Tabela de vértices do arquivo: cada nome só é decodificado quando acessado"""
+
+    def __init__(self, starts: Buffer, blob: memoryview) -> None:
+        self._starts: Buffer = starts
+        self._blob: memoryview = blob
+
+    def __len__(self) -> int:
+        return len(self._starts) - 1
+
+    def __getitem__(self, index: int) -> str:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return str(self._blob[self._starts[index]:self._starts[index + 1]], "utf-8")
+
+
+# Grava um Graph ou WeightedGraph (ou um CSRGraph) no formato binário
+def save_graph(graph: Union[Graph[V], CSRGraph[V]], path: str, allow_pickle: bool = False) -> None:
+    csr: CSRGraph[V] = graph if isinstance(graph, CSRGraph) else CSRGraph.from_graph(graph)
+    csr.save(path, allow_pickle)
+
+
+def load_graph(path: str, allow_pickle: bool = False) -> CSRGraph:
+    return CSRGraph.load(path, allow_pickle)
+
+
+def _aligned(position: int) -> int:
+    return (position + 7) & ~7
+
+
+def _little_endian(values: array) -> bytes:
+    if sys.byteorder == "big":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _write_section(file: BinaryIO, data: bytes) -> None:
+    file.write(data)
+    file.write(bytes(_aligned(len(data)) - len(data))) # completa até 8 bytes
+
+
+def _read_section(view: memoryview, position: int, typecode: str, count: int) -> tuple[Buffer, int]:
+    size: int = count * array(typecode).itemsize
+    section: Buffer = view[position:position + size].cast(typecode)
+    if sys.byteorder == "big":
+        # o arquivo é little-endian: aqui não dá para evitar a cópia
+        section = array(typecode, section)
+        section.byteswap()
+    return section, _aligned(position + size)
@@ -1,35 +1,27 @@
 from __future__ import annotations
-from typing import TypeVar, Optional
-from dataclasses import dataclass
+from typing import TypeVar, Optional, Generic, Iterable
+from collections import OrderedDict
+import sys
 from mst import WeightedPath, print_weight_path
 from weighted_graph import WeightedGraph
 from weighted_graph import WeightedEdge
-from generic_search import PriorityQueue
+from generic_search import IndexedPriorityQueue
 
 
 V = TypeVar('V')
 
 
-@dataclass
-class DijkstraNode:
-	vertex: int
-	distance: float
-	def __lt__(self, other: DijkstraNode) -> bool:
-		return self.distance < other.distance
-	def __eq__(self, other: DijkstraNode) -> bool:
-		return self.distance == other.distance
-
-
 def dijkstra(wg: WeightedGraph[V], root: V) -> tuple[list[Optional[float]], dict[int, WeightedEdge]]:
 	first: int = wg.index_of(root) # encontra o índice inicial
 	# inicialmente, as distâncias são desconhecidas
 	distances: list[Optional[float]] = [None] * wg.vertex_count
 	distances[first] = 0 # a raiz está a uma distância 0 da raiz
 	path_dict: dict[int, WeightedEdge] = {} # como chegamos até cada vértice
-	pq: PriorityQueue[DijkstraNode] = PriorityQueue()
-	pq.push(DijkstraNode(first, 0))
+	# cada vértice aparece no máximo uma vez na fila; melhorias usam decrease_key
+	pq: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+	pq.push(first, 0)
 	while not pq.empty:
-		u: int = pq.pop().vertex # explora o vértice mais próximo a seguir
+		u: int = pq.pop() # explora o vértice mais próximo a seguir
 		dist_u: float = distances[u] # caso já tenha sido visto
 		# analisa todas as arestas/vértices a partir deste vértice
 		for we in wg.edges_for_index(u):
@@ -42,10 +34,275 @@ def dijkstra(wg: WeightedGraph[V], root: V) -> tuple[list[Optional[float]], dict
 				# atualiza a aresta no caminho mínimo até este vértice
 				path_dict[we.v] = we
 				# será explorado em breve
-				pq.push(DijkstraNode(we.v, we.weight + dist_u))
+				pq.push_or_decrease(we.v, we.weight + dist_u)
+	return distances, path_dict
+
+
+# Dijkstra de Dial para pesos inteiros não negativos: em vez de um heap, um anel de
+# max_weight + 1 baldes indexados pela distância. Tirar o próximo vértice custa O(1)
+# amortizado e não se cria nenhum objeto por inserção. Entradas velhas nos baldes
+# (de vértices que depois melhoraram) são só ignoradas ao sair
+def dial_dijkstra(wg: WeightedGraph[V], root: V) -> tuple[list[Optional[int]], dict[int, WeightedEdge]]:
+	first: int = wg.index_of(root)
+	max_weight: int = 0
+	for u in range(wg.vertex_count):
+		for we in wg.edges_for_index(u):
+			if we.weight < 0 or we.weight != int(we.weight):
+				raise ValueError(f"dial_dijkstra precisa de pesos inteiros não negativos, não {we.weight}")
+			max_weight = max(max_weight, int(we.weight))
+
+	distances: list[Optional[int]] = [None] * wg.vertex_count
+	distances[first] = 0
+	path_dict: dict[int, WeightedEdge] = {}
+	# toda distância pendente está entre a atual e a atual + max_weight, então
+	# max_weight + 1 baldes em anel bastam
+	ring: int = max_weight + 1
+	buckets: list[list[int]] = [[] for _ in range(ring)]
+	buckets[0].append(first)
+	pending: int = 1 # entradas nos baldes, incluindo as velhas
+	current: int = 0
+	while pending:
+		bucket: list[int] = buckets[current % ring]
+		while bucket:
+			u: int = bucket.pop()
+			pending -= 1
+			if distances[u] != current:
+				continue # entrada velha: u já saiu por uma distância menor
+			for we in wg.edges_for_index(u):
+				new_distance: int = current + int(we.weight)
+				dist_v: Optional[int] = distances[we.v]
+				if dist_v is None or dist_v > new_distance:
+					distances[we.v] = new_distance
+					path_dict[we.v] = we
+					buckets[new_distance % ring].append(we.v)
+					pending += 1
+		current += 1
 	return distances, path_dict
 
 
+# Delta-stepping (Meyer e Sanders): baldes de largura delta. Dentro de um balde, as
+# arestas leves (peso <= delta) são relaxadas em fases, todas as requisições de uma
+# fase de uma vez; as pesadas, uma única vez quando o balde esvazia. Com delta
+# pequeno vira Dijkstra, com delta grande vira Bellman-Ford. Por padrão delta é o
+# peso médio das arestas. Aceita pesos reais não negativos
+def delta_stepping(wg: WeightedGraph[V], root: V, delta: Optional[float] = None) -> tuple[list[Optional[float]], dict[int, WeightedEdge]]:
+	first: int = wg.index_of(root)
+	light: list[list[WeightedEdge]] = [[] for _ in range(wg.vertex_count)]
+	heavy: list[list[WeightedEdge]] = [[] for _ in range(wg.vertex_count)]
+	edges: list[list[WeightedEdge]] = [wg.edges_for_index(u) for u in range(wg.vertex_count)]
+	if delta is None:
+		weights: list[float] = [we.weight for u_edges in edges for we in u_edges]
+		delta = sum(weights) / len(weights) if weights else 1
+	if delta <= 0:
+		delta = 1 # todas as arestas têm peso 0: qualquer largura serve
+	for u, u_edges in enumerate(edges):
+		for we in u_edges:
+			if we.weight < 0:
+				raise ValueError(f"delta_stepping precisa de pesos não negativos, não {we.weight}")
+			(light if we.weight <= delta else heavy)[u].append(we)
+
+	distances: list[Optional[float]] = [None] * wg.vertex_count
+	distances[first] = 0
+	path_dict: dict[int, WeightedEdge] = {}
+	buckets: dict[int, set[int]] = {0: {first}}
+
+	def relax(requests: list[tuple[WeightedEdge, float]]) -> None:
+		for we, new_distance in requests:
+			dist_v: Optional[float] = distances[we.v]
+			if dist_v is None or dist_v > new_distance:
+				if dist_v is not None:
+					buckets.get(int(dist_v // delta), set()).discard(we.v)
+				distances[we.v] = new_distance
+				path_dict[we.v] = we
+				buckets.setdefault(int(new_distance // delta), set()).add(we.v)
+
+	while buckets:
+		index: int = min(buckets)
+		settled: set[int] = set()
+		# fases leves: reinserções no mesmo balde voltam a ser processadas
+		while buckets.get(index):
+			frontier: set[int] = buckets.pop(index)
+			settled |= frontier
+			relax([(we, distances[u] + we.weight) for u in frontier for we in light[u]])
+		buckets.pop(index, None)
+		relax([(we, distances[u] + we.weight) for u in settled for we in heavy[u]])
+	return distances, path_dict
+
+
+# Caminho mínimo entre um par de vértices: para assim que o destino sai da fila,
+# sem assentar o resto do grafo. Devolve None se o destino for inalcançável
+def shortest_path(wg: WeightedGraph[V], source: V, target: V) -> Optional[WeightedPath]:
+	first: int = wg.index_of(source)
+	last: int = wg.index_of(target)
+	if first == last:
+		return []
+	# dicionários em vez de listas: só pagamos pelos vértices de fato alcançados
+	distances: dict[int, float] = {first: 0}
+	path_dict: dict[int, WeightedEdge] = {}
+	pq: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+	pq.push(first, 0)
+	while not pq.empty:
+		u: int = pq.pop()
+		if u == last: # a distância do destino não muda mais
+			return path_dict_to_path(first, last, path_dict)
+		dist_u: float = distances[u]
+		for we in wg.edges_for_index(u):
+			dist_v: Optional[float] = distances.get(we.v)
+			if dist_v is None or dist_v > we.weight + dist_u:
+				distances[we.v] = we.weight + dist_u
+				path_dict[we.v] = we
+				pq.push_or_decrease(we.v, we.weight + dist_u)
+	return None
+
+
+# Dijkstra bidirecional: uma busca parte da origem, outra do destino, e param quando
+# a soma dos topos das duas filas já não pode melhorar o melhor encontro visto.
+# Como Graph, supõe um grafo não direcionado (as arestas servem nos dois sentidos)
+def bidirectional_dijkstra(wg: WeightedGraph[V], source: V, target: V) -> Optional[WeightedPath]:
+	first: int = wg.index_of(source)
+	last: int = wg.index_of(target)
+	if first == last:
+		return []
+	distances: tuple[dict[int, float], dict[int, float]] = ({first: 0}, {last: 0})
+	path_dicts: tuple[dict[int, WeightedEdge], dict[int, WeightedEdge]] = ({}, {})
+	queues: tuple[IndexedPriorityQueue[int], IndexedPriorityQueue[int]] = (IndexedPriorityQueue(), IndexedPriorityQueue())
+	queues[0].push(first, 0)
+	queues[1].push(last, 0)
+	best: float = float("inf") # menor distância já vista por algum vértice de encontro
+	meeting: Optional[int] = None
+	while not queues[0].empty and not queues[1].empty:
+		top_forward: float = queues[0].priority(queues[0].peek())
+		top_backward: float = queues[1].priority(queues[1].peek())
+		if top_forward + top_backward >= best:
+			break
+		side: int = 0 if top_forward <= top_backward else 1 # avança a fila mais atrasada
+		dist, other, path_dict, pq = distances[side], distances[1 - side], path_dicts[side], queues[side]
+		u: int = pq.pop()
+		dist_u: float = dist[u]
+		for we in wg.edges_for_index(u):
+			dist_v: Optional[float] = dist.get(we.v)
+			if dist_v is None or dist_v > we.weight + dist_u:
+				dist[we.v] = we.weight + dist_u
+				path_dict[we.v] = we
+				pq.push_or_decrease(we.v, we.weight + dist_u)
+				if we.v in other and dist[we.v] + other[we.v] < best:
+					best = dist[we.v] + other[we.v]
+					meeting = we.v
+	if meeting is None:
+		return None
+	# da origem ao encontro pela busca direta
+	edge_path: WeightedPath = path_dict_to_path(first, meeting, path_dicts[0]) if meeting != first else []
+	# do encontro ao destino pela busca reversa, invertendo cada aresta
+	vertex: int = meeting
+	while vertex != last:
+		e: WeightedEdge = path_dicts[1][vertex]
+		edge_path.append(e.reversed())
+		vertex = e.u
+	return edge_path
+
+
+# Reparo incremental (no estilo Ramalingam-Reps) de um resultado de dijkstra depois
+# de inserir arestas ou diminuir pesos (uma aresta paralela mais leve conta como
+# diminuição). As arestas já devem estar no grafo. Só os vértices cuja distância
+# melhora voltam para a fila; o resto da árvore fica como estava. Altera distances
+# e path_dict no lugar. Aumentos de peso e remoções não são tratados
+def repair_dijkstra(wg: WeightedGraph[V], distances: list[Optional[float]],
+		path_dict: dict[int, WeightedEdge], edges: Iterable[WeightedEdge]) -> None:
+	# vértices adicionados depois do cálculo começam inalcançáveis
+	distances.extend([None] * (wg.vertex_count - len(distances)))
+	pq: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+	for edge in edges:
+		# como Graph, as arestas valem nos dois sentidos
+		for we in (edge, edge.reversed()):
+			dist_u: Optional[float] = distances[we.u]
+			if dist_u is None:
+				continue
+			dist_v: Optional[float] = distances[we.v]
+			if dist_v is None or dist_v > we.weight + dist_u:
+				distances[we.v] = we.weight + dist_u
+				path_dict[we.v] = we
+				pq.push_or_decrease(we.v, we.weight + dist_u)
+
+	# o mesmo laço de dijkstra, mas partindo só dos vértices afetados
+	while not pq.empty:
+		u: int = pq.pop()
+		dist_u = distances[u]
+		for we in wg.edges_for_index(u):
+			dist_v = distances[we.v]
+			if dist_v is None or dist_v > we.weight + dist_u:
+				distances[we.v] = we.weight + dist_u
+				path_dict[we.v] = we
+				pq.push_or_decrease(we.v, we.weight + dist_u)
+
+
+# Cache LRU dos resultados de dijkstra por raiz. Cada entrada guarda a versão do
+# grafo em que foi calculada; se o grafo mudou (add_edge/add_vertex), tudo é
+# descartado na próxima consulta. Os resultados devolvidos são compartilhados
+# com o cache e não devem ser alterados por quem chama
+class DijkstraCache(Generic[V]):
+	def __init__(self, wg: WeightedGraph[V], maxsize: int = 128, max_bytes: Optional[int] = None) -> None:
+		self._wg: WeightedGraph[V] = wg
+		self.maxsize: int = maxsize
+		self.max_bytes: Optional[int] = max_bytes # estimativa pelo tamanho das listas e dicionários
+		self._entries: OrderedDict[V, tuple[list[Optional[float]], dict[int, WeightedEdge], int]] = OrderedDict()
+		self._version: int = wg.version
+		self._bytes: int = 0
+		self.hits: int = 0
+		self.misses: int = 0
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	@property
+	def size_bytes(self) -> int:
+		return self._bytes
+
+	def get(self, root: V) -> tuple[list[Optional[float]], dict[int, WeightedEdge]]:
+		if self._wg.version != self._version: # o grafo mudou: nada aqui vale mais
+			self.clear()
+			self._version = self._wg.version
+		if root in self._entries:
+			self.hits += 1
+			self._entries.move_to_end(root) # o mais recente vai para o fim
+			distances, path_dict, _ = self._entries[root]
+			return distances, path_dict
+		self.misses += 1
+		distances, path_dict = dijkstra(self._wg, root)
+		self._store(root, distances, path_dict)
+		return distances, path_dict
+
+	def _store(self, root: V, distances: list[Optional[float]], path_dict: dict[int, WeightedEdge]) -> None:
+		size: int = sys.getsizeof(distances) + sys.getsizeof(path_dict)
+		if self.max_bytes is not None and size > self.max_bytes:
+			return # maior que o cache inteiro: não vale guardar
+		self._entries[root] = (distances, path_dict, size)
+		self._bytes += size
+		# remove os menos usados recentemente até caber nos dois limites
+		while len(self._entries) > self.maxsize or (self.max_bytes is not None and self._bytes > self.max_bytes):
+			_, (_, _, evicted) = self._entries.popitem(last=False)
+			self._bytes -= evicted
+
+	# Repara todas as árvores guardadas depois de inserir as arestas dadas, em vez
+	# de descartá-las. Supõe que essas arestas são as únicas mudanças desde o último
+	# get ou repair; qualquer outra alteração do grafo não é vista aqui
+	def repair(self, edges: Iterable[WeightedEdge]) -> None:
+		edges = list(edges)
+		self._bytes = 0
+		for root, (distances, path_dict, _) in self._entries.items():
+			repair_dijkstra(self._wg, distances, path_dict, edges)
+			size: int = sys.getsizeof(distances) + sys.getsizeof(path_dict)
+			self._entries[root] = (distances, path_dict, size)
+			self._bytes += size
+		self._version = self._wg.version
+		while self.max_bytes is not None and self._bytes > self.max_bytes:
+			_, (_, _, evicted) = self._entries.popitem(last=False)
+			self._bytes -= evicted
+
+	def clear(self) -> None:
+		self._entries.clear()
+		self._bytes = 0
+
+
 # Função auxiliar para ter um acesso mais fácil aos resultados de dijkstra
 def distance_array_to_vertex_dict(wg: WeightedGraph[V], distances: list[Optional[float]]) -> dict[V, Optional[float]]:
 	distance_dict: dict[int, Optional[float]] = {}
@@ -107,6 +364,10 @@ if __name__ == '__main__':
 	for key, value in name_distance.items():
 		print(f"{key}: {value}")
 	print("") # linha em branco
+	print(f"Dial and delta-stepping agree: {dial_dijkstra(city_graph2, 'Los Angeles')[0] == distances == delta_stepping(city_graph2, 'Los Angeles')[0]}")
 	print("Shortest path from Los Angeles to Boston:")
 	path: WeightedPath = path_dict_to_path(city_graph2.index_of("Los Angeles"), city_graph2.index_of("Boston"), path_dict)
 	print_weight_path(city_graph2, path)
+	print("") # linha em branco
+	print("Bidirectional shortest path from Los Angeles to Boston:")
+	print_weight_path(city_graph2, bidirectional_dijkstra(city_graph2, "Los Angeles", "Boston"))
@@ -12,8 +12,19 @@ from typing import (
     Any,
     Optional,
     Protocol,
+    Tuple,
+    Iterator,
+    Generator,
+    NamedTuple,
 )
 from heapq import heappush, heappop
+from bisect import insort, bisect_left, bisect_right
+from itertools import count
+from array import array
+from math import inf
+from time import perf_counter, monotonic
+from queue import Empty
+import multiprocessing
 
 T = TypeVar('T')
 
@@ -65,6 +76,74 @@ def binary_contains(sequence: Sequence[C], key: C) -> bool:
     return False
 
 
+def binary_contains_many(sequence: Sequence[C], keys: Iterable[C]) -> List[bool]:
+    """Testa várias chaves de uma vez numa sequência ordenada.
+
+    As chaves são percorridas em ordem crescente (ordenadas uma vez, guardando a
+    posição original) e cada busca galopa a partir de onde a anterior parou, então
+    consultas próximas custam quase nada. Os resultados saem na ordem de keys."""
+    keys = list(keys)
+    results: List[bool] = [False] * len(keys)
+    size: int = len(sequence)
+    low: int = 0  # tudo antes de low é menor que a chave anterior
+
+    for position in sorted(range(len(keys)), key=keys.__getitem__):
+        key: C = keys[position]
+        # galope: dobra o salto até passar da chave, depois busca binária no trecho
+        step: int = 1
+        bound: int = low
+        while bound < size and sequence[bound] < key:
+            low = bound + 1
+            bound = low + step
+            step *= 2
+
+        low = bisect_left(sequence, key, low, min(bound, size))
+        results[position] = low < size and sequence[low] == key
+
+    return results
+
+
+class EytzingerIndex:
+    """Índice de pertinência sobre valores ordenados, guardados num array no layout
+    de Eytzinger (a ordem de uma busca em largura na árvore binária de busca).
+
+    Os primeiros níveis da árvore ficam juntos no inicio do array, o que deixa a
+    descida mais amigável ao cache do que a busca binária sobre a lista original."""
+
+    def __init__(self, sorted_values: Sequence[int], typecode: str = 'q') -> None:
+        self._size: int = len(sorted_values)
+        # posição 0 fica sem uso para que os filhos de k sejam 2k e 2k + 1
+        self._layout: array = array(typecode, [0]) * (self._size + 1)
+        self._fill(sorted_values, 0, 1)
+
+    def _fill(self, values: Sequence[int], i: int, k: int) -> int:
+        # percurso em ordem da árvore implícita: esquerda, nó, direita
+        if k <= self._size:
+            i = self._fill(values, i, 2 * k)
+            self._layout[k] = values[i]
+            i = self._fill(values, i + 1, 2 * k + 1)
+        return i
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, key: int) -> bool:
+        layout: array = self._layout
+        size: int = self._size
+        k: int = 1
+
+        while k <= size:
+            value: int = layout[k]
+            if value == key:
+                return True
+            k = 2 * k + (value < key)
+
+        return False
+
+    def contains_many(self, keys: Iterable[int]) -> List[bool]:
+        return [key in self for key in keys]
+
+
 class Stack(Generic[T]):
     def __init__(self) -> None:
         self._container: List[T] = []
@@ -84,6 +163,9 @@ class Stack(Generic[T]):
 
 
 class Node(Generic[T]):
+    # sem __dict__ por instância: cada nó ocupa só os quatro campos
+    __slots__ = ('state', 'parent', 'cost', 'heuristic')
+
     def __init__(self, state: T, parent: Optional[Node],
                  cost: float = 0.0, heuristic: float = 0.0
                  ) -> None:
@@ -93,12 +175,132 @@ class Node(Generic[T]):
         self.heuristic: float = heuristic
 
     def __lt__(self, other: Node):
-        return (self.cost + self.heuristic) < (other.cost + self.heuristic)
+        return (self.cost + self.heuristic) < (other.cost + other.heuristic)
+
+
+class SearchStats:
+    """Instrumentação opcional das buscas: contadores, picos de memória e tempo por fase.
+
+    `on_expand`, se passado, é chamado com cada nó logo depois de ele ser expandido."""
+
+    def __init__(self, on_expand: Optional[Callable[[Any], None]] = None) -> None:
+        self.nodes_expanded: int = 0
+        self.nodes_generated: int = 0
+        self.duplicates_pruned: int = 0
+        self.frontier_peak: int = 0
+        self.explored_peak: int = 0
+        # segundos gastos em cada fase; "total" é o tempo de parede da busca inteira
+        self.timings: Dict[str, float] = {
+            "goal_test": 0.0, "successors": 0.0, "heuristic": 0.0, "frontier": 0.0, "total": 0.0
+        }
+        self.on_expand: Optional[Callable[[Any], None]] = on_expand
+        self._start: float = 0.0
+
+    def instrument(self, goal_test: Callable, successors: Callable, frontier: Any) -> tuple:
+        """Devolve versões cronometradas de goal_test, successors e da fronteira"""
+        self._start = perf_counter()
+        timings: Dict[str, float] = self.timings
+
+        def timed_goal_test(state: Any) -> bool:
+            started: float = perf_counter()
+            result: bool = goal_test(state)
+            now: float = perf_counter()
+            timings["goal_test"] += now - started
+            timings["total"] = now - self._start
+            return result
+
+        def timed_successors(state: Any) -> List:
+            started: float = perf_counter()
+            children: List = successors(state)
+            timings["successors"] += perf_counter() - started
+            self.nodes_generated += len(children)
+            return children
+
+        return timed_goal_test, timed_successors, _TimedFrontier(frontier, self)
+
+    def timed(self, phase: str, function: Callable) -> Callable:
+        """Envolve uma função qualquer somando o seu tempo na fase indicada"""
+        timings: Dict[str, float] = self.timings
+
+        def wrapper(*args: Any) -> Any:
+            started: float = perf_counter()
+            result: Any = function(*args)
+            timings[phase] = timings.get(phase, 0.0) + perf_counter() - started
+            return result
+
+        return wrapper
+
+    def expanded(self, node: Any, explored_size: int) -> None:
+        self.nodes_expanded += 1
+        self.explored_peak = max(self.explored_peak, explored_size)
+        self.timings["total"] = perf_counter() - self._start
+        if self.on_expand is not None:
+            self.on_expand(node)
+
+    def __repr__(self) -> str:
+        return (f"SearchStats(expanded={self.nodes_expanded}, generated={self.nodes_generated}, "
+                f"pruned={self.duplicates_pruned}, frontier_peak={self.frontier_peak}, "
+                f"explored_peak={self.explored_peak}, timings={self.timings})")
+
+
+class _TimedFrontier:
+    """Envolve Stack, Queue ou IndexedPriorityQueue medindo tempo e tamanho máximo"""
+
+    def __init__(self, frontier: Any, stats: SearchStats) -> None:
+        self._frontier: Any = frontier
+        self._stats: SearchStats = stats
+        self._size: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return self._frontier.empty
+
+    def __contains__(self, item: Any) -> bool:
+        return item in self._frontier
+
+    def peek(self) -> Any:
+        return self._frontier.peek()
 
+    def priority(self, key: Any) -> float:
+        return self._frontier.priority(key)
+
+    def _grew(self, started: float) -> None:
+        self._size += 1
+        self._stats.frontier_peak = max(self._stats.frontier_peak, self._size)
+        self._stats.timings["frontier"] += perf_counter() - started
+
+    def push(self, *args: Any) -> None:
+        started: float = perf_counter()
+        self._frontier.push(*args)
+        self._grew(started)
+
+    def push_or_decrease(self, key: Any, priority: float) -> None:
+        started: float = perf_counter()
+        if key in self._frontier:
+            self._frontier.push_or_decrease(key, priority)
+            self._stats.timings["frontier"] += perf_counter() - started
+        else:
+            self._frontier.push(key, priority)
+            self._grew(started)
+
+    def pop(self) -> Any:
+        started: float = perf_counter()
+        item: Any = self._frontier.pop()
+        self._size -= 1
+        self._stats.timings["frontier"] += perf_counter() - started
+        return item
+
+
+def dfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+        interned: Optional[StateEncoding] = None,
+        stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if interned is not None:
+        return _interned_search(initial, goal_test, successors, Stack(), interned, stats)
 
-def dfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]]) -> Optional[Node[T]]:
     # frontier correspondea os lugares que ainda não visitamos
     frontier: Stack[Node[T]] = Stack()
+    if stats is not None:
+        goal_test, successors, frontier = stats.instrument(goal_test, successors, frontier)
     frontier.push(Node(initial, None))
 
     # explored corresponte locais em que já estivemos
@@ -116,6 +318,8 @@ def dfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], Li
         # verifica para onde podemos ir em seguida e que ainda não tenha sido explorado
         for child in successors(current_state):
             if child in explored:  # ignora os filhos que já tenham sido explorados
+                if stats is not None:
+                    stats.duplicates_pruned += 1
                 continue
 
             # adiciona aos locais explorados
@@ -123,10 +327,16 @@ def dfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], Li
             # adiciona local a ir
             frontier.push(Node(child, current_node))
 
+        if stats is not None:
+            stats.expanded(current_node, len(explored))
+
     return None  # passamos por todos os lugares e não atingimos o objetivo
 
 
 def node_to_path(node: Node[T]) -> List:
+    if isinstance(node, CompactNode):
+        return node.tree.path(node.index)
+
     path: List[T] = [node.state]
 
     # trabalha no sentido inverso, do final para o inicio
@@ -157,8 +367,15 @@ class Queue(Generic[T]):
         return repr(self._container)
 
 
-def bfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]]) -> Optional[Node[T]]:
+def bfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+        interned: Optional[StateEncoding] = None,
+        stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if interned is not None:
+        return _interned_search(initial, goal_test, successors, Queue(), interned, stats)
+
     frontier: Queue[Node[T]] = Queue()
+    if stats is not None:
+        goal_test, successors, frontier = stats.instrument(goal_test, successors, frontier)
     frontier.push(Node(initial, None))
 
     explored: Set[T] = {initial}
@@ -172,14 +389,85 @@ def bfs(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], Li
 
         for child in successors(current_state):
             if child in explored:
+                if stats is not None:
+                    stats.duplicates_pruned += 1
                 continue
 
             explored.add(child)
             frontier.push(Node(child, current_node))
 
+        if stats is not None:
+            stats.expanded(current_node, len(explored))
+
     return None
 
 
+def bidirectional_bfs(initial: T, goal: T, successors: Callable[[T], List[T]],
+                      predecessors: Callable[[T], List[T]]) -> Optional[Node[T]]:
+    """Busca em largura que cresce a partir do inicio e do objetivo ao mesmo tempo"""
+    if initial == goal:
+        return Node(initial, None)
+
+    # cada lado guarda o nó pelo qual chegou em cada estado
+    forward: Dict[T, Node[T]] = {initial: Node(initial, None)}
+    backward: Dict[T, Node[T]] = {goal: Node(goal, None)}
+    forward_layer: List[Node[T]] = [forward[initial]]
+    backward_layer: List[Node[T]] = [backward[goal]]
+
+    while forward_layer and backward_layer:
+        # expande sempre a camada menor, o que mantém as duas fronteiras equilibradas
+        expand_forward: bool = len(forward_layer) <= len(backward_layer)
+        if expand_forward:
+            layer, explored, other, neighbors = forward_layer, forward, backward, successors
+        else:
+            layer, explored, other, neighbors = backward_layer, backward, forward, predecessors
+
+        next_layer: List[Node[T]] = []
+        best: Optional[tuple] = None  # (tamanho, nó deste lado, nó do outro lado)
+
+        for current_node in layer:
+            for child in neighbors(current_node.state):
+                if child in other:
+                    # as fronteiras se encontraram; termina a camada para pegar o menor caminho
+                    length: float = current_node.cost + 1 + other[child].cost
+                    if best is None or length < best[0]:
+                        best = (length, current_node, other[child])
+                    continue
+
+                if child in explored:
+                    continue
+
+                explored[child] = Node(child, current_node, current_node.cost + 1)
+                next_layer.append(explored[child])
+
+        if best is not None:
+            _, near, far = best
+            if not expand_forward:
+                # a junção é sempre feita do início para o objetivo
+                near, far = far, near
+
+            return _join_bidirectional(near, far)
+
+        if expand_forward:
+            forward_layer = next_layer
+        else:
+            backward_layer = next_layer
+
+    return None
+
+
+def _join_bidirectional(forward_node: Node[T], backward_node: Node[T]) -> Node[T]:
+    """Emenda a cadeia do lado do inicio com a cadeia invertida do lado do objetivo"""
+    node: Node[T] = forward_node
+    current: Optional[Node[T]] = backward_node
+
+    while current is not None:
+        node = Node(current.state, node, node.cost + 1)
+        current = current.parent
+
+    return node
+
+
 class PriorityQueue(Generic[T]):
     def __init__(self) -> None:
         self._container: List[T] = []
@@ -198,27 +486,662 @@ class PriorityQueue(Generic[T]):
         return repr(self._container)
 
 
+class IndexedPriorityQueue(Generic[T]):
+    """Heap binário indexado pela chave (estado ou índice de vértice), com decrease_key"""
+
+    def __init__(self) -> None:
+        self._keys: List[T] = []
+        self._priorities: List[float] = []
+        self._positions: Dict[T, int] = {}  # posição de cada chave dentro do heap
+
+    @property
+    def empty(self) -> bool:
+        return not self._keys
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: T) -> bool:
+        return key in self._positions
+
+    def priority(self, key: T) -> float:
+        return self._priorities[self._positions[key]]
+
+    def peek(self) -> T:
+        """Chave de menor prioridade, sem retirá-la da fila"""
+        return self._keys[0]
+
+    def push(self, key: T, priority: float) -> None:
+        if key in self._positions:
+            raise KeyError(f"{key} já está na fila")
+
+        self._keys.append(key)
+        self._priorities.append(priority)
+        self._positions[key] = len(self._keys) - 1
+        self._sift_up(len(self._keys) - 1)
+
+    def pop(self) -> T:
+        key: T = self._keys[0]
+        last_key: T = self._keys.pop()
+        last_priority: float = self._priorities.pop()
+        del self._positions[key]
+
+        if self._keys:
+            # o último elemento vai para a raiz e desce até o lugar certo
+            self._keys[0] = last_key
+            self._priorities[0] = last_priority
+            self._positions[last_key] = 0
+            self._sift_down(0)
+
+        return key
+
+    def decrease_key(self, key: T, priority: float) -> None:
+        index: int = self._positions[key]
+        if priority > self._priorities[index]:
+            raise ValueError("decrease_key não pode aumentar a prioridade")
+
+        self._priorities[index] = priority
+        self._sift_up(index)
+
+    def push_or_decrease(self, key: T, priority: float) -> None:
+        """Insere a chave ou melhora a sua prioridade se ela já estiver na fila"""
+        if key in self._positions:
+            if priority < self._priorities[self._positions[key]]:
+                self.decrease_key(key, priority)
+        else:
+            self.push(key, priority)
+
+    def _sift_up(self, index: int) -> None:
+        keys, priorities, positions = self._keys, self._priorities, self._positions
+        key: T = keys[index]
+        priority: float = priorities[index]
+
+        while index > 0:
+            parent: int = (index - 1) >> 1
+            if priorities[parent] <= priority:
+                break
+            # desce o pai em vez de trocar os dois a cada passo
+            keys[index] = keys[parent]
+            priorities[index] = priorities[parent]
+            positions[keys[index]] = index
+            index = parent
+
+        keys[index] = key
+        priorities[index] = priority
+        positions[key] = index
+
+    def _sift_down(self, index: int) -> None:
+        keys, priorities, positions = self._keys, self._priorities, self._positions
+        size: int = len(keys)
+        key: T = keys[index]
+        priority: float = priorities[index]
+
+        while True:
+            child: int = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and priorities[child + 1] < priorities[child]:
+                child += 1
+            if priorities[child] >= priority:
+                break
+            keys[index] = keys[child]
+            priorities[index] = priorities[child]
+            positions[keys[index]] = index
+            index = child
+
+        keys[index] = key
+        priorities[index] = priority
+        positions[key] = index
+
+    def __repr__(self) -> str:
+        return repr(list(zip(self._keys, self._priorities)))
+
+
 def astar(initial: T, goal_test: Callable[[T], bool],
-          successors: Callable[[T], List[T]], heuristic: Callable[[T], float]
-          ) -> Optional[T]:
-    frontier: PriorityQueue[Node[T]] = PriorityQueue()
-    frontier.push(Node(initial, None, 0.0, heuristic(initial)))
+          successors: Callable[[T], List[T]], heuristic: Callable[[T], float],
+          interned: Optional[StateEncoding] = None,
+          stats: Optional[SearchStats] = None) -> Optional[Node[T]]:
+    if interned is not None:
+        return _interned_astar(initial, goal_test, successors, heuristic, interned, stats)
+
+    # a fronteira guarda cada estado uma única vez; melhorias usam decrease_key
+    frontier: IndexedPriorityQueue[T] = IndexedPriorityQueue()
+    if stats is not None:
+        goal_test, successors, frontier = stats.instrument(goal_test, successors, frontier)
+        heuristic = stats.timed("heuristic", heuristic)
+    initial_heuristic: float = heuristic(initial)
+    frontier.push(initial, initial_heuristic)
+
+    # explored guarda o melhor nó conhecido para cada estado
+    explored: Dict[T, Node[T]] = {initial: Node(initial, None, 0.0, initial_heuristic)}
 
-    explored: Dict[T, float] = {initial: 0.0}
+    while not frontier.empty:
+        current_state: T = frontier.pop()
+        current_node: Node[T] = explored[current_state]
+
+        if goal_test(current_state):
+            return current_node
+
+        for child in successors(current_state):
+            new_coast: float = current_node.cost + 1
+
+            if child not in explored or explored[child].cost > new_coast:
+                child_heuristic: float = heuristic(child) if child not in explored else explored[child].heuristic
+                explored[child] = Node(child, current_node, new_coast, child_heuristic)
+                frontier.push_or_decrease(child, new_coast + child_heuristic)
+            elif stats is not None:
+                stats.duplicates_pruned += 1
+
+        if stats is not None:
+            stats.expanded(current_node, len(explored))
+
+    return None
+
+
+# Protocolo de sucessores com custo: devolve pares (estado, custo da aresta)
+WeightedSuccessors = Callable[[T], List[Tuple[T, float]]]
+
+
+def weighted_astar(initial: T, goal_test: Callable[[T], bool],
+                   successors: WeightedSuccessors, heuristic: Callable[[T], float],
+                   weight: float = 1.0) -> Optional[Node[T]]:
+    """A* com custos reais nas arestas e f = g + weight * h.
+
+    Com weight = 1 é o A* ótimo; com weight > 1 o custo encontrado fica no
+    máximo weight vezes o ótimo, expandindo bem menos nós."""
+    frontier: IndexedPriorityQueue[T] = IndexedPriorityQueue()
+    explored: Dict[T, Node[T]] = {initial: Node(initial, None, 0.0, heuristic(initial))}
+    frontier.push(initial, weight * explored[initial].heuristic)
 
     while not frontier.empty:
-        current_node: Node[T] = frontier.pop()
-        current_state: T = current_node.state
+        current_state: T = frontier.pop()
+        current_node: Node[T] = explored[current_state]
 
         if goal_test(current_state):
             return current_node
 
+        for child, edge_cost in successors(current_state):
+            new_coast: float = current_node.cost + edge_cost
+
+            if child not in explored or explored[child].cost > new_coast:
+                child_heuristic: float = heuristic(child) if child not in explored else explored[child].heuristic
+                explored[child] = Node(child, current_node, new_coast, child_heuristic)
+                frontier.push_or_decrease(child, new_coast + weight * child_heuristic)
+
+    return None
+
+
+def focal_search(initial: T, goal_test: Callable[[T], bool],
+                 successors: WeightedSuccessors, heuristic: Callable[[T], float],
+                 weight: float = 1.5,
+                 focal_heuristic: Optional[Callable[[T], float]] = None) -> Optional[Node[T]]:
+    """Busca focal (A*ε): entre os nós abertos com f <= weight * f mínimo, expande
+    o de menor focal_heuristic (por padrão a própria heurística).
+
+    O custo da solução fica no máximo weight vezes o ótimo. Supõe custos e
+    heurísticas não negativos."""
+    if weight < 1:
+        # com weight < 1 o limite fica abaixo do f mínimo e focal pode ficar vazio
+        raise ValueError(f"focal_search precisa de weight >= 1, não {weight}")
+    if focal_heuristic is None:
+        focal_heuristic = heuristic
+
+    serial = count()  # desempate estável, nunca compara estados
+    explored: Dict[T, Node[T]] = {initial: Node(initial, None, 0.0, heuristic(initial))}
+    open_list: List[tuple] = []  # (f, serial, estado) em ordem crescente de f
+    focal: List[tuple] = []  # heap de (focal_heuristic, serial, entrada de open_list)
+    in_open: Dict[T, tuple] = {}  # entrada atual de cada estado aberto
+    bound: float = -inf  # todo aberto com f <= bound está também em focal
+
+    def open_node(node: Node[T]) -> None:
+        entry: tuple = (node.cost + node.heuristic, next(serial), node.state)
+        insort(open_list, entry)
+        in_open[node.state] = entry
+        if entry[0] <= bound:
+            heappush(focal, (focal_heuristic(node.state), entry[1], entry))
+
+    def close_entry(entry: tuple) -> None:
+        del open_list[bisect_left(open_list, entry)]
+        del in_open[entry[2]]
+
+    open_node(explored[initial])
+
+    while open_list:
+        new_bound: float = weight * open_list[0][0]
+        if new_bound > bound:
+            # entradas que passaram a caber no limite entram em focal
+            start: int = bisect_right(open_list, (bound, inf))
+            end: int = bisect_right(open_list, (new_bound, inf))
+            for entry in open_list[start:end]:
+                heappush(focal, (focal_heuristic(entry[2]), entry[1], entry))
+        bound = new_bound
+
+        while True:
+            _, _, entry = heappop(focal)
+            # descarta entradas substituídas, já expandidas ou fora do limite atual
+            if in_open.get(entry[2]) is entry and entry[0] <= bound:
+                break
+
+        close_entry(entry)
+        current_node: Node[T] = explored[entry[2]]
+
+        if goal_test(current_node.state):
+            return current_node
+
+        for child, edge_cost in successors(current_node.state):
+            new_coast: float = current_node.cost + edge_cost
+
+            if child not in explored or explored[child].cost > new_coast:
+                child_heuristic: float = heuristic(child) if child not in explored else explored[child].heuristic
+                if child in in_open:
+                    close_entry(in_open[child])
+                explored[child] = Node(child, current_node, new_coast, child_heuristic)
+                open_node(explored[child])
+
+    return None
+
+
+def ida_star(initial: T, goal_test: Callable[[T], bool],
+             successors: Callable[[T], List[T]], heuristic: Callable[[T], float],
+             thresholds: Optional[List[float]] = None) -> Optional[Node[T]]:
+    """A* por aprofundamento iterativo: só guarda o caminho atual, memória O(profundidade).
+
+    Se `thresholds` for passada, recebe o limite usado em cada iteração;
+    o número de iterações é o tamanho dessa lista."""
+    root: Node[T] = Node(initial, None, 0.0, heuristic(initial))
+    if goal_test(initial):
+        if thresholds is not None:
+            thresholds.append(root.heuristic)
+        return root
+
+    threshold: float = root.heuristic
+    done: object = object()  # marca o fim dos sucessores de um nó
+
+    while True:
+        if thresholds is not None:
+            thresholds.append(threshold)
+
+        next_threshold: float = inf  # menor f que ultrapassou o limite atual
+        on_path: Set[T] = {initial}  # evita ciclos dentro do caminho atual
+        stack: List[Tuple[Node[T], Iterator[T]]] = [(root, iter(successors(initial)))]
+
+        while stack:
+            current_node, children = stack[-1]
+            child = next(children, done)
+
+            if child is done:  # todos os filhos vistos, volta um nível
+                stack.pop()
+                on_path.discard(current_node.state)
+                continue
+
+            if child in on_path:
+                continue
+
+            new_coast: float = current_node.cost + 1
+            child_heuristic: float = heuristic(child)
+            if new_coast + child_heuristic > threshold:
+                next_threshold = min(next_threshold, new_coast + child_heuristic)
+                continue
+
+            child_node: Node[T] = Node(child, current_node, new_coast, child_heuristic)
+            if goal_test(child):
+                return child_node
+
+            on_path.add(child)
+            stack.append((child_node, iter(successors(child))))
+
+        if next_threshold == inf:  # nada foi podado: o espaço acabou sem solução
+            return None
+
+        threshold = next_threshold
+
+
+class StateEncoding(NamedTuple):
+    """Bijeção entre estados e inteiros de 0 a size - 1 (por exemplo, a célula de
+    um labirinto vira row * columns + column). Com ela a SearchTree guarda só
+    arrays indexados pelo próprio código, sem dicionário nem lista de estados"""
+    encode: Callable[[Any], int]
+    decode: Callable[[int], Any]
+    size: int
+
+
+_UNSEEN: int = -2  # pai de um código que ainda não está na árvore codificada
+
+
+class SearchTree(Generic[T]):
+    """Árvore de busca compacta: o id de cada estado é o seu código na
+    StateEncoding, e pais e custos ficam em arrays indexados por ele, em vez de
+    um objeto Node por expansão. Nenhum estado é guardado: decode os recria"""
+
+    def __init__(self, encoding: StateEncoding) -> None:
+        self._encoding: StateEncoding = encoding
+        self._size: int = 0
+        self._parents: array = array('i', [_UNSEEN]) * encoding.size  # -1 indica a raiz
+        self._costs: array = array('d', [0.0]) * encoding.size
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, state: T) -> bool:
+        return self._parents[self._encoding.encode(state)] != _UNSEEN
+
+    def add(self, state: T, parent: int, cost: float = 0.0) -> int:
+        index: int = self._encoding.encode(state)
+        self._size += 1
+        self._parents[index] = parent
+        self._costs[index] = cost
+        return index
+
+    def id_of(self, state: T) -> int:
+        return self._encoding.encode(state)
+
+    def state_at(self, index: int) -> T:
+        return self._encoding.decode(index)
+
+    def parent_at(self, index: int) -> int:
+        return self._parents[index]
+
+    def cost_at(self, index: int) -> float:
+        return self._costs[index]
+
+    def update(self, index: int, parent: int, cost: float) -> None:
+        self._parents[index] = parent
+        self._costs[index] = cost
+
+    def node(self, index: int, heuristic: float = 0.0, state: Optional[T] = None) -> CompactNode[T]:
+        return CompactNode(self, index, heuristic, state)
+
+    def path(self, index: int) -> List[T]:
+        path: List[T] = []
+
+        # segue os pais no array até a raiz
+        while index != -1:
+            path.append(self._encoding.decode(index))
+            index = self._parents[index]
+
+        path.reverse()
+        return path
+
+
+class CompactNode(Generic[T]):
+    """Visão de um nó dentro de uma SearchTree, com a mesma interface de Node.
+    state, parent e cost são lidos da árvore em O(1)"""
+    __slots__ = ('tree', 'index', 'heuristic', '_state')
+
+    def __init__(self, tree: SearchTree[T], index: int, heuristic: float = 0.0,
+                 state: Optional[T] = None) -> None:
+        self.tree: SearchTree[T] = tree
+        self.index: int = index
+        self.heuristic: float = heuristic
+        self._state: Optional[T] = state  # evita decodificar o estado de novo
+
+    @property
+    def state(self) -> T:
+        if self._state is None:
+            self._state = self.tree.state_at(self.index)
+        return self._state
+
+    @property
+    def parent(self) -> Optional[CompactNode[T]]:
+        parent: int = self.tree.parent_at(self.index)
+        return None if parent == -1 else CompactNode(self.tree, parent)
+
+    @property
+    def cost(self) -> float:
+        return self.tree.cost_at(self.index)
+
+
+def _interned_search(initial: T, goal_test: Callable[[T], bool],
+                     successors: Callable[[T], List[T]], frontier: Any,
+                     encoding: StateEncoding,
+                     stats: Optional[SearchStats] = None) -> Optional[CompactNode[T]]:
+    """dfs ou bfs sobre a SearchTree; o tipo de fronteira (Stack ou Queue) define a
+    ordem. A fronteira guarda só os estados ainda abertos; pais e custos ficam na árvore"""
+    tree: SearchTree[T] = SearchTree(encoding)
+    if stats is not None:
+        goal_test, successors, frontier = stats.instrument(goal_test, successors, frontier)
+    tree.add(initial, -1)
+    frontier.push(initial)
+
+    while not frontier.empty:
+        current_state: T = frontier.pop()
+        current: int = tree.id_of(current_state)
+
+        if goal_test(current_state):
+            return tree.node(current, state=current_state)
+
+        cost: float = tree.cost_at(current) + 1
+        for child in successors(current_state):
+            if child in tree:  # a própria árvore faz o papel de explored
+                if stats is not None:
+                    stats.duplicates_pruned += 1
+                continue
+
+            tree.add(child, current, cost)
+            frontier.push(child)
+
+        if stats is not None:
+            stats.expanded(tree.node(current, state=current_state), len(tree))
+
+    return None
+
+
+def _interned_astar(initial: T, goal_test: Callable[[T], bool],
+                    successors: Callable[[T], List[T]], heuristic: Callable[[T], float],
+                    encoding: StateEncoding,
+                    stats: Optional[SearchStats] = None) -> Optional[CompactNode[T]]:
+    tree: SearchTree[T] = SearchTree(encoding)
+    frontier: IndexedPriorityQueue[T] = IndexedPriorityQueue()
+    if stats is not None:
+        goal_test, successors, frontier = stats.instrument(goal_test, successors, frontier)
+        heuristic = stats.timed("heuristic", heuristic)
+    tree.add(initial, -1)
+    frontier.push(initial, heuristic(initial))
+
+    while not frontier.empty:
+        # a prioridade de quem sai é g + h: dela sai a heurística sem recalcular
+        current_priority: float = frontier.priority(frontier.peek())
+        current_state: T = frontier.pop()
+        current: int = tree.id_of(current_state)
+        current_heuristic: float = current_priority - tree.cost_at(current)
+
+        if goal_test(current_state):
+            return tree.node(current, current_heuristic, current_state)
+
+        new_coast: float = tree.cost_at(current) + 1
         for child in successors(current_state):
+            if child not in tree:
+                tree.add(child, current, new_coast)
+                frontier.push(child, new_coast + heuristic(child))
+                continue
+
+            child_id: int = tree.id_of(child)
+            if tree.cost_at(child_id) <= new_coast:
+                if stats is not None:
+                    stats.duplicates_pruned += 1
+                continue
+            # só melhora quem ainda está aberto (heurística consistente)
+            child_heuristic: float = frontier.priority(child) - tree.cost_at(child_id) \
+                if child in frontier else heuristic(child)
+            tree.update(child_id, current, new_coast)
+            frontier.push_or_decrease(child, new_coast + child_heuristic)
+
+        if stats is not None:
+            stats.expanded(tree.node(current, current_heuristic, current_state), len(tree))
+
+    return None
+
+
+# Variantes em forma de gerador: devolvem cada nó expandido assim que ele sai da
+# fronteira e podem ser interrompidas por um orçamento de nós (max_nodes) ou por
+# um prazo absoluto (deadline, em segundos de time.monotonic()). O valor de
+# retorno do gerador é o nó objetivo ou, se o orçamento acabar antes, o melhor
+# nó parcial: o de menor heurística, ou o último expandido se não houver heurística.
+SearchGenerator = Generator[Node[T], None, Optional[Node[T]]]
+
+
+def _budget_exhausted(expanded: int, max_nodes: Optional[int], deadline: Optional[float]) -> bool:
+    if max_nodes is not None and expanded >= max_nodes:
+        return True
+
+    return deadline is not None and monotonic() >= deadline
+
+
+def _search_iter(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+                 frontier: Any, heuristic: Optional[Callable[[T], float]],
+                 max_nodes: Optional[int], deadline: Optional[float]) -> SearchGenerator:
+    frontier.push(Node(initial, None, 0.0, heuristic(initial) if heuristic else 0.0))
+    explored: Set[T] = {initial}
+    best: Optional[Node[T]] = None
+    expanded: int = 0
+
+    while not frontier.empty:
+        if _budget_exhausted(expanded, max_nodes, deadline):
+            return best
+
+        current_node: Node[T] = frontier.pop()
+        expanded += 1
+        yield current_node
+
+        if goal_test(current_node.state):
+            return current_node
+
+        if best is None or heuristic is None or current_node.heuristic < best.heuristic:
+            best = current_node
+
+        for child in successors(current_node.state):
+            if child in explored:
+                continue
+
+            explored.add(child)
+            frontier.push(Node(child, current_node, current_node.cost + 1,
+                               heuristic(child) if heuristic else 0.0))
+
+    return None
+
+
+def dfs_iter(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+             heuristic: Optional[Callable[[T], float]] = None,
+             max_nodes: Optional[int] = None, deadline: Optional[float] = None) -> SearchGenerator:
+    return _search_iter(initial, goal_test, successors, Stack(), heuristic, max_nodes, deadline)
+
+
+def bfs_iter(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+             heuristic: Optional[Callable[[T], float]] = None,
+             max_nodes: Optional[int] = None, deadline: Optional[float] = None) -> SearchGenerator:
+    return _search_iter(initial, goal_test, successors, Queue(), heuristic, max_nodes, deadline)
+
+
+def astar_iter(initial: T, goal_test: Callable[[T], bool],
+               successors: Callable[[T], List[T]], heuristic: Callable[[T], float],
+               max_nodes: Optional[int] = None, deadline: Optional[float] = None) -> SearchGenerator:
+    frontier: IndexedPriorityQueue[T] = IndexedPriorityQueue()
+    initial_heuristic: float = heuristic(initial)
+    frontier.push(initial, initial_heuristic)
+    explored: Dict[T, Node[T]] = {initial: Node(initial, None, 0.0, initial_heuristic)}
+    best: Optional[Node[T]] = None
+    expanded: int = 0
+
+    while not frontier.empty:
+        if _budget_exhausted(expanded, max_nodes, deadline):
+            return best
+
+        current_node: Node[T] = explored[frontier.pop()]
+        expanded += 1
+        yield current_node
+
+        if goal_test(current_node.state):
+            return current_node
+
+        if best is None or current_node.heuristic < best.heuristic:
+            best = current_node
+
+        for child in successors(current_node.state):
             new_coast: float = current_node.cost + 1
 
-            if child not in explored or explored[child] > new_coast:
-                explored[child] = new_coast
-                frontier.push(Node(child, current_node,
-                                   new_coast, heuristic(child)))
+            if child not in explored or explored[child].cost > new_coast:
+                child_heuristic: float = heuristic(child) if child not in explored else explored[child].heuristic
+                explored[child] = Node(child, current_node, new_coast, child_heuristic)
+                frontier.push_or_decrease(child, new_coast + child_heuristic)
 
     return None
+
+
+def run_search(search: SearchGenerator) -> Optional[Node[T]]:
+    """Consome um gerador de busca até o fim e devolve o seu resultado"""
+    while True:
+        try:
+            next(search)
+        except StopIteration as stop:
+            return stop.value
+
+
+def fork_context() -> Any:
+    """Contexto de multiprocessing com fork onde ele existe: os processos herdam
+    grafos e funções sem serializá-los. Nos demais sistemas, o padrão da plataforma"""
+    methods: List[str] = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context("fork" if "fork" in methods else None)
+
+
+def _portfolio_worker(name: str, search: Callable, args: tuple, results: Any) -> None:
+    node: Optional[Node] = search(*args)
+    # devolve o caminho e não a cadeia de nós, que seria cara (e recursiva) de serializar
+    results.put((name, node_to_path(node) if node is not None else None))
+
+
+def portfolio_search(initial: T, goal_test: Callable[[T], bool], successors: Callable[[T], List[T]],
+                     heuristics: Optional[Dict[str, Callable[[T], float]]] = None,
+                     timeout: Optional[float] = None, first: bool = True
+                     ) -> Optional[Tuple[str, List[T]]]:
+    """Roda dfs, bfs e um astar por heurística ao mesmo tempo, cada um no seu processo.
+
+    Com first=True devolve a primeira solução que chegar; senão espera todas (ou o
+    timeout, em segundos) e devolve o menor caminho. O resultado é (estratégia, caminho)
+    e os processos que ainda estiverem rodando são encerrados. Onde existe fork, as
+    funções não precisam ser serializáveis; nos demais sistemas precisam."""
+    strategies: Dict[str, Tuple[Callable, tuple]] = {
+        "dfs": (dfs, (initial, goal_test, successors)),
+        "bfs": (bfs, (initial, goal_test, successors)),
+    }
+    for name, heuristic in (heuristics or {}).items():
+        strategies[f"astar:{name}"] = (astar, (initial, goal_test, successors, heuristic))
+
+    context = fork_context()
+    results = context.Queue()
+    processes: List[Any] = [
+        context.Process(target=_portfolio_worker, args=(name, search, args, results), daemon=True)
+        for name, (search, args) in strategies.items()
+    ]
+    for process in processes:
+        process.start()
+
+    deadline: Optional[float] = None if timeout is None else monotonic() + timeout
+    best: Optional[Tuple[str, List[T]]] = None
+    received: int = 0
+
+    try:
+        while received < len(processes):
+            wait: float = 0.1 if deadline is None else min(0.1, deadline - monotonic())
+            if wait <= 0:
+                break
+
+            try:
+                name, path = results.get(timeout=wait)
+            except Empty:
+                # um processo que morreu sem responder não deve travar a espera
+                if not any(process.is_alive() for process in processes) and results.empty():
+                    break
+                continue
+
+            received += 1
+            if path is not None and (best is None or len(path) < len(best[1])):
+                best = (name, path)
+            if first and best is not None:
+                break
+    finally:
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+
+    return best
@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic, Optional
+from typing import TypeVar, Generic, Optional, Iterable
 from edge import Edge
 
 
@@ -7,8 +7,13 @@ V = TypeVar('V') # tipo dos vértices no grafo
 
 class Graph(Generic[V]):
     def __init__(self, vertices: list[V] = []) -> None:
-        self._vertices: list[V] = vertices
-        self._edges: list[list[Edge]] = [[] for _ in vertices]
+        self._vertices: list[V] = list(vertices) # cópia, para não compartilhar a lista padrão
+        self._edges: list[list[Edge]] = [[] for _ in self._vertices]
+        # índice de cada vértice, para consultas em O(1) em vez de list.index
+        self._indices: dict[V, int] = {}
+        for index, vertex in enumerate(self._vertices):
+            self._indices.setdefault(vertex, index)
+        self._version: int = 0 # muda a cada alteração; permite descartar resultados antigos
 
     @property
     def vertex_count(self) -> int:
@@ -17,18 +22,29 @@ class Graph(Generic[V]):
     @property
     def edge_count(self) -> int:
         return sum(map(len, self._edges)) # Número de arestas
+
+    @property
+    def version(self) -> int:
+        return self._version
     
     # Adicione um vértice no grafo e devolve o seu index
     def add_vertex(self, vertex: V) -> int:
         self._vertices.append(vertex)
         self._edges.append([]) # Adicione uma lista vazia para conter as arestas
+        self._indices.setdefault(vertex, self.vertex_count - 1)
+        self._version += 1
         return self.vertex_count - 1 # Devolve o indice do vértice adicionado
+
+    # Adiciona vários vértices de uma vez e devolve os seus índices
+    def add_vertices(self, vertices: Iterable[V]) -> list[int]:
+        return [self.add_vertex(vertex) for vertex in vertices]
     
     # Este grafo não é direcionado,
     # portanto, smpre adicionamos arestas nas duas direções
     def add_edge(self, edge: Edge) -> None:
         self._edges[edge.u].append(edge)
         self._edges[edge.v].append(edge.reversed())
+        self._version += 1
 
     # Adiciona uma aresta usando indices dos vértices (método auxiliar)
     def add_edge_by_indices(self, u: int, v: int) -> None:
@@ -37,17 +53,26 @@ class Graph(Generic[V]):
 
     # Adicionando uma aresta consultando os indices dos vértices (método auxiliar)
     def add_edge_by_vertices(self, first: V, second: V) -> None:
-        u: int = self._vertices.index(first)
-        v: int = self._vertices.index(second)
+        u: int = self.index_of(first)
+        v: int = self.index_of(second)
         self.add_edge_by_indices(u, v)
 
+    # Adiciona várias arestas a partir de pares de vértices
+    def add_edges_by_vertices(self, pairs: Iterable[tuple[V, V]]) -> None:
+        for first, second in pairs:
+            self.add_edge_by_vertices(first, second)
+
     # Encontra o vértice em um índice especifico
     def vertex_at(self, index: int) -> V:
         return self._vertices[index]
 
     # Ecnontra o índice de um vértices no grafo
     def index_of(self, vertex: V) -> int:
-        return self._vertices.index(vertex)
+        try:
+            return self._indices[vertex]
+        except KeyError:
+            # mesmo erro que list.index levantava
+            raise ValueError(f"{vertex} não está no grafo") from None
 
     # Encontra os vértices aos quais um vértice com determinado índice está conectado
     def neighbors_for_index(self, index: int) -> list[V]:
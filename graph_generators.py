@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Optional
+from math import log, floor, hypot
+import random
+from weighted_graph import WeightedGraph
+from weighted_edge import WeightedEdge
+
+
+# Geradores de grafos sintéticos grandes, todos com semente para serem
+# reprodutíveis. Os vértices são os inteiros 0..n-1 (o vértice coincide com o
+# índice) e, como Graph, as arestas não são direcionadas. Os pesos inteiros vão
+# de 1 a max_weight, o que também serve para dial_dijkstra
+
+
+def _empty_graph(n: int) -> WeightedGraph[int]:
+    return WeightedGraph(list(range(n)))
+
+
+# Grade rows x cols com vizinhança de 4 (ruas de uma cidade)
+def grid_graph(rows: int, cols: int, seed: Optional[int] = None, max_weight: int = 10) -> WeightedGraph[int]:
+    rng: random.Random = random.Random(seed)
+    wg: WeightedGraph[int] = _empty_graph(rows * cols)
+    for row in range(rows):
+        for col in range(cols):
+            u: int = row * cols + col
+            if col + 1 < cols:
+                wg.add_edge(WeightedEdge(u, u + 1, rng.randint(1, max_weight)))
+            if row + 1 < rows:
+                wg.add_edge(WeightedEdge(u, u + cols, rng.randint(1, max_weight)))
+    return wg
+
+
+# Grafo geométrico aleatório: n pontos no quadrado unitário, ligados quando estão a
+# menos de radius; o peso é a distância euclidiana. As células de lado radius
+# evitam comparar todos os pares
+def random_geometric_graph(n: int, radius: float, seed: Optional[int] = None) -> WeightedGraph[int]:
+    rng: random.Random = random.Random(seed)
+    points: list[tuple[float, float]] = [(rng.random(), rng.random()) for _ in range(n)]
+    wg: WeightedGraph[int] = _empty_graph(n)
+    cells: dict[tuple[int, int], list[int]] = {}
+    for u, (x, y) in enumerate(points):
+        cells.setdefault((floor(x / radius), floor(y / radius)), []).append(u)
+
+    for (cx, cy), members in cells.items():
+        for dx, dy in ((0, 0), (1, -1), (1, 0), (1, 1), (0, 1)): # cada par de células uma vez
+            others: Optional[list[int]] = cells.get((cx + dx, cy + dy))
+            if others is None:
+                continue
+            for u in members:
+                x, y = points[u]
+                for v in others:
+                    if (dx, dy) == (0, 0) and v <= u:
+                        continue
+                    distance: float = hypot(x - points[v][0], y - points[v][1])
+                    if distance < radius:
+                        wg.add_edge(WeightedEdge(u, v, distance))
+    return wg
+
+
+# Barabási-Albert: cada vértice novo se liga a m vértices escolhidos com
+# probabilidade proporcional ao grau (distribuição de graus em lei de potência)
+def barabasi_albert_graph(n: int, m: int, seed: Optional[int] = None, max_weight: int = 10) -> WeightedGraph[int]:
+    if m < 1 or m >= n:
+        raise ValueError(f"m deve estar entre 1 e {n - 1}, não {m}")
+    rng: random.Random = random.Random(seed)
+    wg: WeightedGraph[int] = _empty_graph(n)
+    # cada vértice aparece aqui uma vez por aresta: sortear daqui é sortear pelo grau
+    endpoints: list[int] = list(range(m))
+    for u in range(m, n):
+        targets: set[int] = set()
+        while len(targets) < m:
+            targets.add(rng.choice(endpoints))
+        for v in targets:
+            wg.add_edge(WeightedEdge(u, v, rng.randint(1, max_weight)))
+            endpoints.append(v)
+        endpoints.extend([u] * m)
+    return wg
+
+
+# Erdős-Rényi G(n, p): cada par existe com probabilidade p. Em vez de sortear os
+# n²/2 pares, pula direto para o próximo par sorteado com um salto geométrico
+# (Batagelj e Brandes), em tempo proporcional ao número de arestas
+def erdos_renyi_graph(n: int, p: float, seed: Optional[int] = None, max_weight: int = 10) -> WeightedGraph[int]:
+    rng: random.Random = random.Random(seed)
+    wg: WeightedGraph[int] = _empty_graph(n)
+    if p <= 0:
+        return wg
+    if p >= 1:
+        for u in range(n):
+            for v in range(u):
+                wg.add_edge(WeightedEdge(u, v, rng.randint(1, max_weight)))
+        return wg
+
+    log_q: float = log(1 - p)
+    u, v = 1, -1
+    while u < n:
+        v += 1 + int(log(1 - rng.random()) / log_q)
+        while v >= u and u < n:
+            v -= u
+            u += 1
+        if u < n:
+            wg.add_edge(WeightedEdge(u, v, rng.randint(1, max_weight)))
+    return wg
+
+
+if __name__ == '__main__':
+    for name, wg in [("grid", grid_graph(100, 100, seed=1)),
+                     ("geometric", random_geometric_graph(10_000, 0.02, seed=1)),
+                     ("power law", barabasi_albert_graph(10_000, 3, seed=1)),
+                     ("Erdős-Rényi", erdos_renyi_graph(10_000, 0.0005, seed=1))]:
+        print(f"{name}: {wg.vertex_count} vertices, {wg.edge_count // 2} edges")
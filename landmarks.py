@@ -0,0 +1,128 @@
+from __future__ import annotations
+from typing import TypeVar, Optional, Callable
+from array import array
+from math import inf
+from weighted_graph import WeightedGraph
+from weighted_edge import WeightedEdge
+from mst import WeightedPath, print_weight_path
+from dijkstra import dijkstra, path_dict_to_path
+from generic_search import IndexedPriorityQueue
+
+
+V = TypeVar('V') # tipo dos vértices no grafo
+
+
+class Landmarks:
+    """Pré-processamento ALT (A*, landmarks e desigualdade triangular).
+
+    Guarda, para k vértices marco, a distância de cada vértice até o marco. Pela
+    desigualdade triangular, |d(L, t) - d(L, v)| nunca passa de d(v, t), o que dá
+    uma heurística admissível para A* entre quaisquer dois vértices. Como Graph,
+    supõe um grafo não direcionado."""
+
+    def __init__(self, wg: WeightedGraph[V], k: int = 4, first: int = 0) -> None:
+        self.landmarks: list[int] = []
+        self._tables: list[array] = [] # uma tabela de distâncias por marco (inf = inalcançável)
+        if wg.vertex_count == 0:
+            return
+
+        # seleção pelo mais distante: cada novo marco é o vértice mais longe dos já
+        # escolhidos; vértices que nenhum marco alcança (outro componente) vêm primeiro
+        closest: list[float] = [inf] * wg.vertex_count
+        candidate: Optional[int] = _farthest(list(self._distances_from(wg, first)), [])
+        while candidate is not None and len(self.landmarks) < k:
+            self.landmarks.append(candidate)
+            table: array = self._distances_from(wg, candidate)
+            self._tables.append(table)
+            for v in range(wg.vertex_count):
+                closest[v] = min(closest[v], table[v])
+            candidate = _farthest(closest, self.landmarks)
+
+    @staticmethod
+    def _distances_from(wg: WeightedGraph[V], index: int) -> array:
+        distances, _ = dijkstra(wg, wg.vertex_at(index))
+        return array('d', [inf if d is None else d for d in distances])
+
+    # Limite inferior para a distância de v até target
+    def lower_bound(self, v: int, target: int) -> float:
+        bound: float = 0.0
+        for table in self._tables:
+            to_target, to_v = table[target], table[v]
+            if to_target == inf and to_v == inf:
+                continue # o marco não diz nada sobre esses dois
+            if to_target == inf or to_v == inf:
+                return inf # um alcança o marco e o outro não: componentes diferentes
+            bound = max(bound, abs(to_target - to_v))
+        return bound
+
+    def heuristic(self, target: int) -> Callable[[int], float]:
+        def distance(v: int) -> float:
+            return self.lower_bound(v, target)
+        return distance
+
+
+# A* sobre as arestas com peso guiado pelos marcos; devolve o mesmo formato que
+# path_dict_to_path, ou None se o destino for inalcançável
+def alt_shortest_path(wg: WeightedGraph[V], landmarks: Landmarks, source: V, target: V) -> Optional[WeightedPath]:
+    first: int = wg.index_of(source)
+    last: int = wg.index_of(target)
+    if first == last:
+        return []
+    heuristic: Callable[[int], float] = landmarks.heuristic(last)
+    if heuristic(first) == inf:
+        return None
+
+    distances: dict[int, float] = {first: 0}
+    path_dict: dict[int, WeightedEdge] = {}
+    pq: IndexedPriorityQueue[int] = IndexedPriorityQueue()
+    pq.push(first, heuristic(first))
+    while not pq.empty:
+        u: int = pq.pop()
+        if u == last:
+            return path_dict_to_path(first, last, path_dict)
+        dist_u: float = distances[u]
+        for we in wg.edges_for_index(u):
+            dist_v: Optional[float] = distances.get(we.v)
+            if dist_v is None or dist_v > we.weight + dist_u:
+                distances[we.v] = we.weight + dist_u
+                path_dict[we.v] = we
+                pq.push_or_decrease(we.v, we.weight + dist_u + heuristic(we.v))
+    return None
+
+
+def _farthest(distances: list[float], chosen: list[int]) -> Optional[int]:
+    best: Optional[int] = None
+    for v, distance in enumerate(distances):
+        if v in chosen:
+            continue
+        if best is None or distance > distances[best]:
+            best = v
+    return best
+
+
+if __name__ == '__main__':
+    city_graph2: WeightedGraph[str] = WeightedGraph([
+        "Seattle", "San Francisco", "Los Angeles", "Riverside", "Phoenix",
+        "Chicago", "Boston", "New York", "Atlanta", "Miami", "Dallas",
+        "Houston", "Detroit", "Philadelphia", "Washington"
+    ])
+    city_graph2.add_edges_by_vertices([
+        ("Seattle", "Chicago", 1737), ("Seattle", "San Francisco", 678),
+        ("San Francisco", "Riverside", 386), ("San Francisco", "Los Angeles", 348),
+        ("Los Angeles", "Riverside", 50), ("Los Angeles", "Phoenix", 357),
+        ("Riverside", "Phoenix", 307), ("Riverside", "Chicago", 1704),
+        ("Phoenix", "Dallas", 887), ("Phoenix", "Houston", 1015),
+        ("Dallas", "Chicago", 805), ("Dallas", "Atlanta", 721),
+        ("Dallas", "Houston", 225), ("Houston", "Atlanta", 702),
+        ("Houston", "Miami", 968), ("Atlanta", "Chicago", 588),
+        ("Atlanta", "Washington", 543), ("Atlanta", "Miami", 604),
+        ("Miami", "Washington", 923), ("Chicago", "Detroit", 238),
+        ("Detroit", "Boston", 613), ("Detroit", "Washington", 396),
+        ("Detroit", "New York", 482), ("Boston", "New York", 190),
+        ("New York", "Philadelphia", 81), ("Philadelphia", "Washington", 123),
+    ])
+
+    landmarks: Landmarks = Landmarks(city_graph2, k=3)
+    print(f"Landmarks: {[city_graph2.vertex_at(l) for l in landmarks.landmarks]}")
+    print("Shortest path from Los Angeles to Boston:")
+    print_weight_path(city_graph2, alt_shortest_path(city_graph2, landmarks, "Los Angeles", "Boston"))
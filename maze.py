@@ -1,9 +1,10 @@
 from enum import Enum
-from typing import List, NamedTuple, Callable, Optional
+from typing import List, NamedTuple, Callable, Optional, Tuple, Sequence
 from math import sqrt
+from array import array
 import random
 # dfs, bfs, node_to_path, astar, Node
-from generic_search import dfs, bfs, node_to_path, astar, Node
+from generic_search import dfs, bfs, node_to_path, astar, weighted_astar, Node, StateEncoding
 
 
 class Cell(str, Enum):
@@ -15,12 +16,35 @@ class Cell(str, Enum):
     PATH = "*"
 
 
+# valores em byte de cada Cell, usados pelo CompactMaze
+_EMPTY, _BLOCKED, _START, _GOAL, _PATH = (ord(cell.value) for cell in Cell)
+_WALLS_AS_VISITED: bytes = bytes(6 if b == _BLOCKED else 0 for b in range(256))
+
+
 class MazeLocation(NamedTuple):
     """Representa um lugar no labirito"""
     row: int
     column: int
 
 
+# próximos pontos de salto por celula: direita, esquerda, baixo, cima (ver Maze.jump_tables)
+JumpTables = Tuple[List[int], List[int], List[int], List[int]]
+
+
+def _next_stops(is_open: Sequence[bool], is_stop: Sequence[bool], step: int) -> List[int]:
+    """Para cada posição de uma linha, a próxima parada na direção step com todas as
+    celulas até ela livres (-1 se uma parede vier antes)"""
+    targets: List[int] = [-1] * len(is_open)
+    following: int = -1
+    for position in (range(len(is_open) - 1, -1, -1) if step == 1 else range(len(is_open))):
+        targets[position] = following
+        if not is_open[position]:
+            following = -1
+        elif is_stop[position]:
+            following = position
+    return targets
+
+
 class Maze:
     def __init__(self, rows: int = 10, columns: int = 10, sparseness: float = 0.2,
                  start: MazeLocation = MazeLocation(0, 0),
@@ -39,6 +63,11 @@ class Maze:
         self._grid[start.row][start.column] = Cell.START
         self._grid[goal.row][goal.column] = Cell.GOAL
 
+        # a versão muda a cada alteração da grade e invalida o campo de distâncias
+        self._version: int = 0
+        self._distance_field: Optional[Tuple[int, MazeLocation, array]] = None
+        self._jump_tables: Optional[Tuple[int, MazeLocation, JumpTables]] = None
+
     def _ramdomly_fill(self, rows: int, columns: int, sparseness: float) -> None:
         """Gera os obstaculos"""
         for row in range(rows):
@@ -50,6 +79,13 @@ class Maze:
         """Testa se esta no objetivo"""
         return ml == self.goal
 
+    def encoding(self) -> StateEncoding:
+        """Célula <-> row * columns + column, para as buscas com interned"""
+        columns: int = self._columns
+        return StateEncoding(lambda ml: ml.row * columns + ml.column,
+                             lambda cell_id: MazeLocation(*divmod(cell_id, columns)),
+                             self._rows * columns)
+
     def sucessors(self, ml: MazeLocation) -> List[MazeLocation]:
         """Retorna a lista de posições posíveis a se mover"""
         locations: List[MazeLocation] = []
@@ -72,12 +108,211 @@ class Maze:
 
         return locations
 
+    def _check_inside(self, ml: MazeLocation) -> None:
+        if not (0 <= ml.row < self._rows and 0 <= ml.column < self._columns):
+            # índices negativos pegariam outra célula no array achatado
+            raise ValueError(f"{ml} está fora do labirinto")
+
+    def _is_open(self, row: int, column: int) -> bool:
+        """Verdadeiro se a celula existe e não está bloqueada"""
+        return 0 <= row < self._rows and 0 <= column < self._columns \
+            and self._grid[row][column] != Cell.BLOCKED
+
+    def _open_row(self, row: int) -> List[bool]:
+        """Celulas livres da linha; linhas fora do labirinto contam como paredes"""
+        if 0 <= row < self._rows:
+            return [cell is not Cell.BLOCKED for cell in self._grid[row]]
+        return [False] * self._columns
+
+    def jump_tables(self) -> JumpTables:
+        """Próximo ponto de salto de cada celula em cada direção, em ordem de linha:
+        a coluna alvo para direita e esquerda, a linha alvo para baixo e cima (-1 se
+        não houver).
+
+        Tudo sai de uma varredura por linha (saltos horizontais) e uma por coluna
+        (verticais), e é reaproveitado até a grade ou o objetivo mudarem; cada salto
+        da busca vira uma única consulta."""
+        if self._jump_tables is not None:
+            version, goal, tables = self._jump_tables
+            if version == self._version and goal == self.goal:
+                return tables
+
+        rows: int = self._rows
+        open_rows: List[List[bool]] = [self._open_row(row) for row in range(-1, rows + 1)]
+        right_rows: List[List[int]] = []
+        left_rows: List[List[int]] = []
+        stop_rows: List[List[bool]] = []
+
+        for row in range(rows):
+            here, above, below = open_rows[row + 1], open_rows[row], open_rows[row + 2]
+            # vizinho forçado: a celula acima/abaixo está livre, mas a anterior a ela não,
+            # então não havia como ter virado antes
+            pairs = list(zip(above, above[1:], below, below[1:]))
+            forced_right: List[bool] = [False] + [(a1 and not a0) or (b1 and not b0) for a0, a1, b0, b1 in pairs]
+            forced_left: List[bool] = [(a0 and not a1) or (b0 and not b1) for a0, a1, b0, b1 in pairs] + [False]
+            if row == self.goal.row:
+                forced_right[self.goal.column] = forced_left[self.goal.column] = True
+            right: List[int] = _next_stops(here, forced_right, 1)
+            left: List[int] = _next_stops(here, forced_left, -1)
+            right_rows.append(right)
+            left_rows.append(left)
+            # na vertical, caminhos canônicos podem virar em qualquer celula de onde saia
+            # um salto horizontal; essas celulas (e o objetivo) são as paradas
+            stops: List[bool] = [r != -1 or l != -1 for r, l in zip(right, left)]
+            if row == self.goal.row:
+                stops[self.goal.column] = True
+            stop_rows.append(stops)
+
+        # as colunas são as linhas da grade transposta
+        open_columns = list(zip(*open_rows[1:rows + 1]))
+        stop_columns = list(zip(*stop_rows))
+        down_columns = [_next_stops(o, s, 1) for o, s in zip(open_columns, stop_columns)]
+        up_columns = [_next_stops(o, s, -1) for o, s in zip(open_columns, stop_columns)]
+
+        def flat(lines) -> List[int]:
+            return [target for line in lines for target in line]
+
+        right, left = flat(right_rows), flat(left_rows)
+        down, up = flat(zip(*down_columns)), flat(zip(*up_columns))
+        tables: JumpTables = (right, left, down, up)
+        self._jump_tables = (self._version, self.goal, tables)
+        return tables
+
+    def _jump_successors(self, ml: MazeLocation, direction: Tuple[int, int]
+                         ) -> List[Tuple[MazeLocation, Tuple[int, int], int]]:
+        """Sucessores da Jump Point Search: pontos de salto com a direção de chegada e a distância"""
+        dr, dc = direction
+        right, left, down, up = self.jump_tables()
+        index: int = ml.row * self._columns + ml.column
+        jumps: List[Tuple[int, int]] = []
+
+        if dr == 0 and dc == 0:  # inicio: todas as direções
+            jumps = [(1, 0), (-1, 0), (0, 1), (0, -1)]
+        elif dr == 0:  # chegou na horizontal: segue em frente e só vira se for forçado
+            jumps.append((0, dc))
+            for side in (-1, 1):
+                if self._is_open(ml.row + side, ml.column) and not self._is_open(ml.row + side, ml.column - dc):
+                    jumps.append((side, 0))
+        else:  # chegou na vertical: segue em frente ou vira para os lados
+            jumps = [(dr, 0), (0, 1), (0, -1)]
+
+        locations: List[Tuple[MazeLocation, Tuple[int, int], int]] = []
+        for jr, jc in jumps:
+            if jr == 0:
+                target: int = (right if jc == 1 else left)[index]
+                if target != -1:
+                    locations.append((MazeLocation(ml.row, target), (jr, jc), abs(target - ml.column)))
+            else:
+                target = (down if jr == 1 else up)[index]
+                if target != -1:
+                    locations.append((MazeLocation(target, ml.column), (jr, jc), abs(target - ml.row)))
+
+        return locations
+
+    def jump_point_search(self) -> Optional[Node[MazeLocation]]:
+        """A* sobre pontos de salto (Jump Point Search para grades 4-conectadas).
+
+        Devolve uma cadeia de Node com todas as celulas do caminho, como astar,
+        para que node_to_path, mark e clear funcionem normalmente."""
+        distance: Callable[[MazeLocation], float] = manhattan_distance(self.goal)
+        # como no JPS clássico, cada celula é um estado só; a direção de chegada vem do
+        # melhor pai conhecido, acompanhado aqui com a mesma regra de custo do A*
+        costs: dict = {self.start: 0}
+        arrivals: dict = {self.start: (0, 0)}
+
+        def successors(ml: MazeLocation) -> List[Tuple[MazeLocation, float]]:
+            cost: int = costs[ml]
+            jump_points: List[Tuple[MazeLocation, float]] = []
+            for jump_point, direction, jump_distance in self._jump_successors(ml, arrivals[ml]):
+                if jump_point not in costs or costs[jump_point] > cost + jump_distance:
+                    costs[jump_point] = cost + jump_distance
+                    arrivals[jump_point] = direction
+                jump_points.append((jump_point, jump_distance))
+            return jump_points
+
+        # na grade quase todos os nós empatam em f; um peso só um pouco acima de 1
+        # desempata a favor dos mais fundos (menor h). Como os custos são inteiros e
+        # h < 10⁹, o custo encontrado continua sendo o ótimo
+        solution: Optional[Node] = weighted_astar(self.start, self.goal_test, successors, distance, weight=1 + 1e-9)
+
+        if solution is None:
+            return None
+
+        # preenche as celulas entre pontos de salto consecutivos
+        jump_points: List[MazeLocation] = node_to_path(solution)
+        node: Node[MazeLocation] = Node(jump_points[0], None)
+        for current, following in zip(jump_points, jump_points[1:]):
+            dr: int = (following.row > current.row) - (following.row < current.row)
+            dc: int = (following.column > current.column) - (following.column < current.column)
+            ml: MazeLocation = current
+            while ml != following:
+                ml = MazeLocation(ml.row + dr, ml.column + dc)
+                node = Node(ml, node, node.cost + 1)
+
+        return node
+
+    def set_cell(self, ml: MazeLocation, cell: Cell) -> None:
+        """Altera uma celula; edições devem passar por aqui para invalidar o campo de distâncias"""
+        self._check_inside(ml)
+        self._grid[ml.row][ml.column] = Cell(cell)  # "X" também vale, mas a grade guarda sempre membros de Cell
+        self._version += 1
+
+    def distance_field(self) -> array:
+        """Distância de cada celula até o objetivo (-1 se inalcançável), em ordem de linha.
+
+        Calculado com uma busca em largura a partir do objetivo e reaproveitado até a
+        grade ou o objetivo mudarem."""
+        if self._distance_field is not None:
+            version, goal, field = self._distance_field
+            if version == self._version and goal == self.goal:
+                return field
+
+        field = array('i', [-1]) * (self._rows * self._columns)
+        field[self.goal.row * self._columns + self.goal.column] = 0
+        layer: List[MazeLocation] = [self.goal]
+        distance: int = 0
+
+        # os movimentos são simétricos, então os sucessores servem de predecessores
+        while layer:
+            distance += 1
+            next_layer: List[MazeLocation] = []
+            for ml in layer:
+                for neighbor in self.sucessors(ml):
+                    index: int = neighbor.row * self._columns + neighbor.column
+                    if field[index] == -1:
+                        field[index] = distance
+                        next_layer.append(neighbor)
+            layer = next_layer
+
+        self._distance_field = (self._version, self.goal, field)
+        return field
+
+    def path_from(self, start: MazeLocation) -> Optional[Node[MazeLocation]]:
+        """Caminho mínimo de start ao objetivo em O(tamanho do caminho), seguindo
+        distâncias decrescentes no campo de distâncias"""
+        self._check_inside(start)
+        field: array = self.distance_field()
+        remaining: int = field[start.row * self._columns + start.column]
+        if remaining == -1:
+            return None
+
+        node: Node[MazeLocation] = Node(start, None)
+        while remaining > 0:
+            remaining -= 1
+            for neighbor in self.sucessors(node.state):
+                if field[neighbor.row * self._columns + neighbor.column] == remaining:
+                    node = Node(neighbor, node, node.cost + 1)
+                    break
+
+        return node
+
     def mark(self, path: List[MazeLocation]):
         for maze_location in path:
             self._grid[maze_location.row][maze_location.column] = Cell.PATH
 
         self._grid[self.start.row][self.start.column] = Cell.START
         self._grid[self.goal.row][self.goal.column] = Cell.GOAL
+        self._version += 1
 
     def clear(self, path: List[MazeLocation]):
         for maze_location in path:
@@ -85,6 +320,7 @@ class Maze:
 
         self._grid[self.start.row][self.start.column] = Cell.START
         self._grid[self.goal.row][self.goal.column] = Cell.GOAL
+        self._version += 1
 
     def __str__(self) -> str:
         output: str = ""
@@ -99,6 +335,149 @@ class Maze:
         return output
 
 
+class CompactMaze(Maze):
+    """Labirinto guardado num bytearray, um byte por celula, em vez de listas de Cell.
+
+    A grade tem uma borda de celulas bloqueadas, assim cada celula é um id inteiro
+    (linha + 1) * largura + (coluna + 1) e os vizinhos são só somas de deslocamentos,
+    sem testes de limite."""
+
+    def __init__(self, rows: int = 10, columns: int = 10, sparseness: float = 0.2,
+                 start: MazeLocation = MazeLocation(0, 0),
+                 goal: MazeLocation = MazeLocation(9, 9)) -> None:
+        self._rows: int = rows
+        self._columns: int = columns
+        self.start: MazeLocation = start
+        self.goal: MazeLocation = goal
+        self._width: int = columns + 2
+
+        self._cells: bytearray = bytearray([_BLOCKED]) * ((rows + 2) * self._width)
+        # mesma ordem de Maze.sucessors: abaixo, acima, esquerda, direita
+        self._offsets: Tuple[int, int, int, int] = (self._width, -self._width, -1, 1)
+
+        self._ramdomly_fill(rows, columns, sparseness)
+
+        self._cells[self.id_of(start)] = _START
+        self._cells[self.id_of(goal)] = _GOAL
+
+        self._version: int = 0
+        self._distance_field: Optional[Tuple[int, MazeLocation, array]] = None
+        self._jump_tables: Optional[Tuple[int, MazeLocation, JumpTables]] = None
+
+    def _ramdomly_fill(self, rows: int, columns: int, sparseness: float) -> None:
+        """Gera os obstaculos com um único bloco de bytes aleatórios traduzido em C"""
+        threshold: int = round(sparseness * 256)  # byte < threshold vira parede
+        table: bytes = bytes(_BLOCKED if b < threshold else _EMPTY for b in range(256))
+        noise: bytes = random.randbytes(rows * columns).translate(table)
+
+        for row in range(rows):
+            first: int = (row + 1) * self._width + 1
+            self._cells[first:first + columns] = noise[row * columns:(row + 1) * columns]
+
+    def id_of(self, ml: MazeLocation) -> int:
+        return (ml.row + 1) * self._width + ml.column + 1
+
+    def location_of(self, cell_id: int) -> MazeLocation:
+        row, column = divmod(cell_id, self._width)
+        return MazeLocation(row - 1, column - 1)
+
+    def encoding(self) -> StateEncoding:
+        return StateEncoding(self.id_of, self.location_of, len(self._cells))
+
+    def sucessor_ids(self, cell_id: int) -> List[int]:
+        """Como sucessors, mas sobre ids inteiros"""
+        cells: bytearray = self._cells
+        return [cell_id + offset for offset in self._offsets if cells[cell_id + offset] != _BLOCKED]
+
+    def sucessors(self, ml: MazeLocation) -> List[MazeLocation]:
+        return [self.location_of(cell_id) for cell_id in self.sucessor_ids(self.id_of(ml))]
+
+    def _is_open(self, row: int, column: int) -> bool:
+        return 0 <= row < self._rows and 0 <= column < self._columns \
+            and self._cells[(row + 1) * self._width + column + 1] != _BLOCKED
+
+    def _open_row(self, row: int) -> List[bool]:
+        if 0 <= row < self._rows:
+            first: int = (row + 1) * self._width + 1
+            return [cell != _BLOCKED for cell in self._cells[first:first + self._columns]]
+        return [False] * self._columns
+
+    def compact_bfs(self) -> Optional[Node[MazeLocation]]:
+        """Busca em largura direto sobre os ids.
+
+        Cada celula guarda num byte o deslocamento pelo qual foi alcançada, então a
+        memória extra é um byte por celula em vez de um Node por estado."""
+        offsets: Tuple[int, int, int, int] = self._offsets
+        start: int = self.id_of(self.start)
+        goal: int = self.id_of(self.goal)
+
+        # 0 = não visitada, 1..4 = índice do deslocamento + 1, 5 = inicio, 6 = parede;
+        # as paredes já nascem "visitadas", assim o laço só testa um byte
+        came_from: bytearray = self._cells.translate(_WALLS_AS_VISITED)
+        came_from[start] = 5
+        directions: List[Tuple[int, int]] = list(enumerate(offsets, 1))
+        layer: List[int] = [start]
+
+        while layer and not came_from[goal]:
+            next_layer: List[int] = []
+            append = next_layer.append
+            for cell_id in layer:
+                for direction, offset in directions:
+                    child: int = cell_id + offset
+                    if not came_from[child]:
+                        came_from[child] = direction
+                        append(child)
+            layer = next_layer
+
+        if not came_from[goal]:
+            return None
+
+        # refaz o caminho de trás para frente pelos deslocamentos guardados
+        ids: List[int] = [goal]
+        while came_from[ids[-1]] != 5:
+            ids.append(ids[-1] - offsets[came_from[ids[-1]] - 1])
+
+        node: Optional[Node[MazeLocation]] = None
+        for cost, cell_id in enumerate(reversed(ids)):
+            node = Node(self.location_of(cell_id), node, float(cost))
+
+        return node
+
+    def mark(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._cells[self.id_of(maze_location)] = _PATH
+
+        self._cells[self.id_of(self.start)] = _START
+        self._cells[self.id_of(self.goal)] = _GOAL
+        self._version += 1
+
+    def clear(self, path: List[MazeLocation]):
+        for maze_location in path:
+            self._cells[self.id_of(maze_location)] = _EMPTY
+
+        self._cells[self.id_of(self.start)] = _START
+        self._cells[self.id_of(self.goal)] = _GOAL
+        self._version += 1
+
+    def set_cell(self, ml: MazeLocation, cell: Cell) -> None:
+        self._check_inside(ml)  # fora da grade sobrescreveria a borda de paredes
+        self._cells[self.id_of(ml)] = ord(Cell(cell).value)
+        self._version += 1
+
+    def __str__(self) -> str:
+        output: str = ""
+
+        output += "=" * self._columns + "==\n"
+
+        for row in range(self._rows):
+            first: int = (row + 1) * self._width + 1
+            output += "=" + self._cells[first:first + self._columns].decode("ascii") + "=\n"
+
+        output += "=" * self._columns + "==\n"
+
+        return output
+
+
 def euclidean_distance(goal: MazeLocation) -> Callable[[MazeLocation], float]:
     def distance(ml: MazeLocation) -> float:
         xdist: int = ml.column - goal.column
@@ -168,3 +547,17 @@ if __name__ == "__main__":
         print(maze)
 
         maze.clear(path3)
+
+    solution4: Optional[Node[MazeLocation]] = maze.jump_point_search()
+
+    if solution4 is None:
+        print("Jump Point Search não achou uma solução")
+
+    else:
+        print("Jump Point Search")
+        path4: List[MazeLocation] = node_to_path(solution4)
+        maze.mark(path4)
+
+        print(maze)
+
+        maze.clear(path4)
@@ -4,19 +4,39 @@ from generic_search import bfs, Node, node_to_path
 
 
 MAX_NUM: int = 3
+BOAT_CAPACITY: int = 2
 
 
 class MCState:
-    def __init__(self, missionaries: int, cannibals: int, boat: bool) -> None:
+    # só os campos necessários; o estado canônico é a chave inteira abaixo
+    __slots__ = ('wm', 'wc', 'em', 'ec', 'boat', 'max_num', 'capacity')
+
+    def __init__(self, missionaries: int, cannibals: int, boat: bool,
+                 max_num: int = MAX_NUM, capacity: int = BOAT_CAPACITY) -> None:
         self.wm: int = missionaries  # missionarios a oeste
         self.wc: int = cannibals  # canibais a oeste
-        self.em: int = MAX_NUM - self.wm  # missionarios a leste
-        self.ec: int = MAX_NUM - self.wc  # canibais a leste
+        self.em: int = max_num - self.wm  # missionarios a leste
+        self.ec: int = max_num - self.wc  # canibais a leste
         self.boat: bool = boat
+        self.max_num: int = max_num  # pessoas de cada grupo
+        self.capacity: int = capacity  # lugares no barco
+
+    @property
+    def key(self) -> int:
+        """Codificação compacta do estado: (wm, wc, boat) empacotados num inteiro"""
+        return (self.wm * (self.max_num + 1) + self.wc) * 2 + self.boat
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, MCState):
+            return NotImplemented
+
+        return self.key == other.key and self.max_num == other.max_num
+
+    def __hash__(self) -> int:
+        return self.key
 
     def goal_test(self) -> bool:
-        return self.is_legal and self.em == MAX_NUM and self.ec == MAX_NUM
+        return self.is_legal and self.em == self.max_num and self.ec == self.max_num
 
 
     @property
@@ -32,29 +52,18 @@ class MCState:
     def successors(self) -> List[MCState]:
         sucs: List[MCState] = []
 
+        # o barco leva de 1 até capacity pessoas da margem onde está
         if self.boat:  # Barco indo para a direita
-            if self.wm > 1:
-                sucs.append(MCState(self.wm - 2, self.wc, not self.boat))
-            if self.wm > 0:
-                sucs.append(MCState(self.wm - 1, self.wc, not self.boat))
-            if self.wc > 1:
-                sucs.append(MCState(self.wm, self.wc - 2, not self.boat))
-            if self.wc > 0:
-                sucs.append(MCState(self.wm, self.wc - 1, not self.boat))
-            if (self.wc > 0) and (self.wm > 0):
-                sucs.append(MCState(self.wm - 1, self.wc - 1, not self.boat))
-
+            missionaries, cannibals, direction = self.wm, self.wc, -1
         else:
-            if self.em > 1:
-                sucs.append(MCState(self.wm + 2, self.wc, not self.boat))
-            if self.em > 0:
-                sucs.append(MCState(self.wm + 1, self.wc, not self.boat))
-            if self.ec > 1:
-                sucs.append(MCState(self.wm, self.wc + 2, not self.boat))
-            if self.ec > 0:
-                sucs.append(MCState(self.wm, self.wc + 1, not self.boat))
-            if (self.ec > 0) and (self.em > 0):
-                sucs.append(MCState(self.wm + 1, self.wc + 1, not self.boat))
+            missionaries, cannibals, direction = self.em, self.ec, 1
+
+        for m in range(min(missionaries, self.capacity) + 1):
+            for c in range(min(cannibals, self.capacity - m) + 1):
+                if m + c == 0:
+                    continue
+                sucs.append(MCState(self.wm + direction * m, self.wc + direction * c,
+                                    not self.boat, self.max_num, self.capacity))
 
         return [x for x in sucs if x.is_legal]
 
@@ -1,11 +1,15 @@
-from typing import TypeVar, Optional
+from typing import TypeVar, Optional, Union
+from array import array
+from multiprocessing import shared_memory
+import multiprocessing
 from weighted_graph import WeightedGraph
 from weighted_edge import WeightedEdge
-from generic_search import PriorityQueue
+from generic_search import PriorityQueue, fork_context
 
 
 V = TypeVar('V') # tipo dos vértices no grafo
 WeightedPath = list[WeightedEdge] # alias de tipo para caminhos
+Buffer = Union[array, memoryview] # array local ou visão da memória compartilhada
 
 
 def total_weight(wp: WeightedPath) -> float:
@@ -37,6 +41,214 @@ def mst(wg: WeightedGraph[V], start: int = 0) -> Optional[WeightedPath]:
     return result
 
 
+class UnionFind:
+    """Conjuntos disjuntos com compressão de caminho e união por posto, sobre arrays"""
+
+    def __init__(self, size: int) -> None:
+        self._parent: array = array('i', range(size))
+        self._rank: bytearray = bytearray(size) # o posto nunca passa de log2(size)
+
+    def find(self, x: int) -> int:
+        parent: array = self._parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]] # compressão por divisão ao meio
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return False # já estavam no mesmo conjunto
+        if self._rank[root_a] < self._rank[root_b]:
+            root_a, root_b = root_b, root_a
+        self._parent[root_b] = root_a
+        if self._rank[root_a] == self._rank[root_b]:
+            self._rank[root_a] += 1
+        return True
+
+
+def _undirected_edges(wg: WeightedGraph[V]) -> tuple[list[WeightedEdge], array, array, array]:
+    # cada aresta não direcionada aparece duas vezes no grafo; fica só a de u < v
+    edges: list[WeightedEdge] = []
+    us: array = array('i')
+    vs: array = array('i')
+    weights: array = array('d')
+    for u in range(wg.vertex_count):
+        for edge in wg.edges_for_index(u):
+            if edge.u < edge.v:
+                edges.append(edge)
+                us.append(edge.u)
+                vs.append(edge.v)
+                weights.append(edge.weight)
+    return edges, us, vs, weights
+
+
+def kruskal(wg: WeightedGraph[V], forest: bool = False) -> Optional[WeightedPath]:
+    """MST de Kruskal: arestas em ordem de peso, unidas com UnionFind.
+
+    Num grafo desconexo devolve None, a não ser que forest=True, quando devolve a
+    floresta geradora mínima (uma árvore por componente)."""
+    edges, us, vs, weights = _undirected_edges(wg)
+    components: UnionFind = UnionFind(wg.vertex_count)
+    result: WeightedPath = []
+    for i in sorted(range(len(edges)), key=weights.__getitem__):
+        if components.union(us[i], vs[i]):
+            result.append(edges[i])
+            if len(result) == wg.vertex_count - 1:
+                break
+    if not forest and len(result) < wg.vertex_count - 1:
+        return None
+    return result
+
+
+# abaixo disso, com processes=None, o Borůvka roda no próprio processo: criar o
+# pool e os processos custa mais do que a varredura das arestas
+PARALLEL_EDGES: int = 200_000
+
+# estado de cada processo trabalhador do Borůvka, preenchido pelo inicializador:
+# rótulos dos componentes e arestas vivas, todos na memória compartilhada
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+_worker_arrays: tuple = ()
+
+
+def _shared_arrays(memory: shared_memory.SharedMemory, vertex_count: int,
+                   edge_count: int) -> tuple[memoryview, memoryview, memoryview, memoryview]:
+    # um único segmento: rótulos (V), depois us, vs e ids das arestas (E cada)
+    flat: memoryview = memory.buf.cast('i')
+    labels: memoryview = flat[:vertex_count]
+    us, vs, ids = (flat[vertex_count + k * edge_count:vertex_count + (k + 1) * edge_count] for k in range(3))
+    return labels, us, vs, ids
+
+
+def _init_boruvka_worker(memory_name: str, vertex_count: int, edge_count: int) -> None:
+    global _worker_memory, _worker_arrays
+    _worker_memory = shared_memory.SharedMemory(name=memory_name)
+    _worker_arrays = _shared_arrays(_worker_memory, vertex_count, edge_count)
+
+
+def _cheapest_edges(labels: Buffer, us: Buffer, vs: Buffer, ids: Buffer,
+                    start: int, end: int, components: int) -> tuple[int, dict[int, int]]:
+    # As arestas vivas em [start, end) estão em ordem de peso (ids crescentes), então a
+    # primeira que sai de um componente é a mais leve dele; empates já foram decididos
+    # pela ordenação, o que impede ciclos. Arestas internas a um componente nunca mais
+    # servem e são descartadas compactando o trecho. Devolve o novo fim do trecho e
+    # {componente: id da aresta}
+    cheapest: dict[int, int] = {}
+    write: int = start
+    read: int = end
+    for position in range(start, end):
+        u, v = us[position], vs[position]
+        a, b = labels[u], labels[v]
+        if a == b:
+            continue
+        edge_id: int = ids[position]
+        if a not in cheapest:
+            cheapest[a] = edge_id
+        if b not in cheapest:
+            cheapest[b] = edge_id
+        if write != position:
+            us[write], vs[write], ids[write] = u, v, edge_id
+        write += 1
+        if len(cheapest) == components:
+            read = position + 1
+            break # todo componente já tem a sua aresta: o resto não pode ser mais leve
+    rest: int = end - read
+    if rest and write != read: # o que não foi olhado só desliza para o lugar
+        us[write:write + rest] = us[read:end]
+        vs[write:write + rest] = vs[read:end]
+        ids[write:write + rest] = ids[read:end]
+    return write + rest, cheapest
+
+
+def _cheapest_edges_in_worker(task: tuple[int, int, int]) -> tuple[int, dict[int, int]]:
+    return _cheapest_edges(*_worker_arrays, *task)
+
+
+def boruvka(wg: WeightedGraph[V], processes: Optional[int] = None, forest: bool = False) -> Optional[WeightedPath]:
+    """MST de Borůvka: a cada rodada, todo componente escolhe a aresta mais leve que sai
+    dele. A busca dessas arestas é dividida em trechos processados em paralelo sobre
+    memória compartilhada; com processes=1, ou com processes=None e menos de
+    PARALLEL_EDGES arestas, tudo roda no processo atual. Num único processo kruskal
+    continua mais rápido (uma passada só); o Borůvka compensa com vários núcleos.
+    Desconexo, como kruskal."""
+    edges, us, vs, weights = _undirected_edges(wg)
+    edge_count: int = len(edges)
+    vertex_count: int = wg.vertex_count
+    # ordena uma única vez: o id de cada aresta passa a ser a sua posição por peso
+    order: list[int] = sorted(range(edge_count), key=weights.__getitem__)
+    edges = [edges[i] for i in order]
+    us, vs = array('i', map(us.__getitem__, order)), array('i', map(vs.__getitem__, order))
+
+    components: UnionFind = UnionFind(vertex_count)
+    result: WeightedPath = []
+    if processes is None:
+        processes = multiprocessing.cpu_count() if edge_count >= PARALLEL_EDGES else 1
+    workers: int = min(processes, edge_count)
+
+    memory: Optional[shared_memory.SharedMemory] = None
+    shared: tuple[memoryview, ...] = ()
+    pool = None
+    try:
+        # o segmento e o pool nascem dentro do try: se o pool não subir, o finally libera o segmento
+        if workers > 1:
+            memory = shared_memory.SharedMemory(create=True, size=4 * (vertex_count + 3 * edge_count))
+            shared = _shared_arrays(memory, vertex_count, edge_count)
+            labels, live_us, live_vs, ids = shared
+            labels[:] = array('i', range(vertex_count))
+            live_us[:], live_vs[:], ids[:] = us, vs, array('i', range(edge_count))
+            pool = fork_context().Pool(workers, initializer=_init_boruvka_worker,
+                                       initargs=(memory.name, vertex_count, edge_count))
+        else:
+            labels = array('i', range(vertex_count))
+            live_us, live_vs, ids = array('i', us), array('i', vs), array('i', range(edge_count))
+        # trechos fixos de arestas, um por tarefa; cada um encolhe conforme perde arestas
+        step: int = -(-edge_count // max(workers, 1)) # divisão arredondando para cima
+        chunks: list[list[int]] = [[start, min(start + step, edge_count)] for start in range(0, edge_count, step or 1)]
+
+        while True:
+            remaining: int = vertex_count - len(result) # componentes que ainda existem
+            tasks: list[tuple[int, int, int]] = [(start, end, remaining) for start, end in chunks]
+            if pool is None:
+                partials = [_cheapest_edges(labels, live_us, live_vs, ids, *task) for task in tasks]
+            else:
+                partials = pool.map(_cheapest_edges_in_worker, tasks)
+
+            for chunk, (end, _) in zip(chunks, partials):
+                chunk[1] = end
+            if len(partials) == 1:
+                cheapest: dict[int, int] = partials[0][1]
+            else: # o menor id (a aresta mais leve) de cada componente entre os trechos
+                cheapest = {}
+                for _, partial in partials:
+                    for component, edge_id in partial.items():
+                        if edge_id < cheapest.get(component, edge_count):
+                            cheapest[component] = edge_id
+
+            added: int = 0
+            for edge_id in set(cheapest.values()):
+                if components.union(us[edge_id], vs[edge_id]):
+                    result.append(edges[edge_id])
+                    added += 1
+            if added == 0:
+                break
+            # só as raízes antigas mudam de rótulo: um find por componente, não por vértice
+            roots: dict[int, int] = {root: components.find(root) for root in set(labels)}
+            labels[:] = array('i', map(roots.__getitem__, labels))
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+        if memory is not None:
+            for view in shared:
+                view.release()
+            memory.close()
+            memory.unlink()
+
+    if not forest and len(result) < vertex_count - 1:
+        return None
+    return result
+
+
 def print_weight_path(wg: WeightedGraph[V], wp: WeightedPath) -> None:
     for edge in wp:
         print(f"{wg.vertex_at(edge.u)} {edge.weight}> {wg.vertex_at(edge.v)}")
@@ -81,3 +293,10 @@ if __name__ == '__main__':
         print("No solution found!")
     else:
         print_weight_path(city_graph2, result)
+
+    print("") # linha em branco
+    print("Kruskal:")
+    print_weight_path(city_graph2, kruskal(city_graph2))
+    print("") # linha em branco
+    print("Borůvka:")
+    print_weight_path(city_graph2, boruvka(city_graph2, processes=2))
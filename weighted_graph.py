@@ -1,4 +1,4 @@
-from typing import TypeVar, Generic
+from typing import TypeVar, Generic, Iterable
 from graph import Graph
 from weighted_edge import WeightedEdge
 
@@ -8,7 +8,7 @@ V = TypeVar('V')
 
 class WeightedGraph(Generic[V], Graph[V]):
     def __init__(self, vertices: list[V] = []) -> None:
-        self._vertices: list[V] = vertices
+        super().__init__(vertices)
         self._edges: list[list[WeightedEdge]] = [[] for _ in self._vertices]
 
     def add_edge_by_indices(self, u: int, v: int, weight: float) -> None:
@@ -16,15 +16,24 @@ class WeightedGraph(Generic[V], Graph[V]):
         self.add_edge(edge)
 
     def add_edge_by_vertices(self, first: V, second: V, weight: float) -> None:
-        u: int = self._vertices.index(first)
-        v: int = self._vertices.index(second)
+        u: int = self.index_of(first)
+        v: int = self.index_of(second)
         self.add_edge_by_indices(u, v, weight)
 
+    def add_edges_by_vertices(self, triples: Iterable[tuple[V, V, float]]) -> None:
+        for first, second, weight in triples:
+            self.add_edge_by_vertices(first, second, weight)
+
     def neighbors_for_index_with_weights(self, index: int) -> list[tuple[V, float]]:
         distance_tuple: list[tuple[V, float]] = []
         for edge in self.edges_for_index(index):
             distance_tuple.append((self.vertex_at(edge.v), edge.weight))
         return distance_tuple
+
+    # Mesma lista consultando o índice do vértice; serve de sucessores com custo
+    # para weighted_astar e focal_search
+    def neighbors_for_vertex_with_weights(self, vertex: V) -> list[tuple[V, float]]:
+        return self.neighbors_for_index_with_weights(self.index_of(vertex))
     
     def __str__(self) -> str:
         desc: str = ""